@@ -1,4 +1,6 @@
 from santa.LinMHelper import LinMHelperApp
 
-root = LinMHelperApp()
-print('主程式結束。')
\ No newline at end of file
+# process 執行模式用 spawn 啟動 worker，會重新 import 這個檔案，GUI 只能在主 process 建立
+if __name__ == '__main__':
+    root = LinMHelperApp()
+    print('主程式結束。')
\ No newline at end of file
@@ -1,222 +1,235 @@
 """
 影像偵測工具 — 混合式偵測策略：
   1. 若 santa/templates/ 下有對應模板 → 使用 cv2.matchTemplate（更穩健）
-  2. 否則 fallback 到像素 RGB 掃描（原始方式）
+  2. 否則 fallback 到像素 RGB 掃描（NumPy 向量化：切片 + 布林遮罩統計）
 
 所有偵測座標由 roi_config.ROI 集中管理。
+每個 tick 把截圖包成 santa.frame.Frame（或呼叫一次 frameToArray()），各偵測函數共用。
+偵測一律唯讀，不會改動截圖；取樣點標示請用 drawProbeOverlay() 畫在副本上。
 """
+import cv2
+import numpy as np
+from PIL import Image
+from santa.frame import Frame
 from santa.roi_config import ROI
+from santa.roi_geometry import compile_roi
 from santa.template_detector import detector
 
 
+# 各模板的匹配信心度門檻
+TEMPLATE_THRESHOLDS = {
+    'team_enabled': 0.65,
+    'panel_opened': 0.75,
+    'is_attack': 0.7,
+    'is_attacked': 0.7,
+}
+
+
+# ====== 像素偵測核心（純讀取 arr，不碰模板也不標記；geo 為 roi_geometry.CompiledROI） ======
+
+def pixelROIOf(arr):
+    """取得 arr 解析度對應的已編譯 ROI（同解析度共用快取）"""
+    return compile_roi(arr.shape[1], arr.shape[0])
+
+
+def teamEnabledByPixel(arr, geo):
+    roi = ROI.Team
+    col = arr[geo.team_cp1][:, :3]
+    th = int(col.shape[0] / 3)  # 原本是 /2，改為 1/3 就過關
+    isC1Matched = int(np.count_nonzero((col > roi.cp1_rgb_threshold).all(axis=1))) > th
+    
+    col = arr[geo.team_cp2][:, :3]
+    isC2Matched = int(np.count_nonzero((col > roi.cp1_rgb_threshold).all(axis=1))) > roi.cp2_min_count
+    return isC1Matched and isC2Matched
+
+
+def teamPositionAvalibleByPixel(arr, geo, teamPosition):
+    roi = ROI.TeamPosition
+    rgbSum = int(arr[geo.team_slot(teamPosition).point][:3].sum(dtype=np.int32))
+    return rgbSum >= roi.rgb_sum_min and rgbSum <= roi.rgb_sum_max
+
+
+def panelOpenedByPixel(arr, geo):
+    col = arr[geo.panel]
+    mask = maskRGB(col, (25, 40), (15, 30), (10, 25)) | maskRGB(col, (15, 25), (15, 25), (15, 25))
+    return int(np.count_nonzero(mask)) / mask.size * 100 >= ROI.Panel.match_threshold_pct
+
+
+def hpPercentByPixel(arr, geo, teamPosition):
+    roi = ROI.HP
+    row = arr[geo.team_slot(teamPosition).hp_row]
+    cnt = int(np.count_nonzero(maskRGB(row, roi.hp_r_range, roi.hp_g_range, roi.hp_b_range)))
+    status_count = int(np.count_nonzero(
+        maskRGB(row, roi.poison_r_range, roi.poison_g_range, roi.poison_b_range)))
+    return int(cnt / row.shape[0] * 100), status_count > 0
+
+
+def mpPercentByPixel(arr, geo, teamPosition):
+    roi = ROI.MP
+    row = arr[geo.team_slot(teamPosition).mp_row]
+    cnt = int(np.count_nonzero(maskRGB(row, roi.mp_r_range, roi.mp_g_range, roi.mp_b_range)))
+    return int(cnt / row.shape[0] * 100)
+
+
+def isAttackByPixel(arr, geo):
+    roi = ROI.Attack
+    rgb = arr[geo.attack][:, :3].astype(np.int16)
+    isAttck = ((rgb[:, 0] - rgb[:, 1] > roi.r_minus_g_threshold)
+               | (rgb[:, 0] - rgb[:, 2] > roi.r_minus_b_threshold))
+    attRate = int(np.count_nonzero(isAttck)) / geo.attack_span * 100
+    return attRate >= roi.rate_threshold
+
+
+def isAttackedByPixel(arr, geo):
+    roi = ROI.Attacked
+    
+    # 區域 1: 右下角
+    block = arr[geo.attacked_area1][..., :3].astype(np.int16)
+    isAttcked = (block[..., 0] > roi.area1_r_threshold) & (block[..., 0] - block[..., 1] > roi.area1_r_minus_g)
+    area = isAttcked.size
+    attRate1 = int(np.count_nonzero(isAttcked)) / area * 100 if area > 0 else 0
+    
+    # 區域 2: 左上角
+    row = arr[geo.attacked_area2][:, :3].astype(np.int16)
+    isAttcked = ((row[:, 0] - row[:, 1] > roi.area2_r_minus_g)
+                 | (row[:, 0] - row[:, 2] > roi.area2_r_minus_b))
+    span = geo.attacked_area2_span
+    attedRate2 = int(np.count_nonzero(isAttcked)) / span * 100 if span > 0 else 0
+    
+    return (attRate1 > roi.area1_rate_threshold) and (attedRate2 > roi.area2_rate_threshold)
+
+
+def isDarkByPixel(arr):
+    """黑畫面/讀取畫面：整張圖大幅抽樣，暗點佔比超過門檻（不需 geo，也不轉灰階）"""
+    roi = ROI.Dark
+    step = roi.sample_step
+    samples = arr[step // 2::step, step // 2::step, :3]
+    dark = (samples < roi.pixel_max).all(axis=2)
+    return int(np.count_nonzero(dark)) * 100 >= roi.dark_ratio_pct * dark.size
+
+
 # ====== 組隊狀態 ======
 
-def detectTeamEnabled(img):
+def detectTeamEnabled(img, arr=None):
     """偵測組隊狀態是否啟用（模板 'team_enabled'）"""
     
     # 嘗試模板比對
     if detector.has_template('team_enabled'):
-        matched, conf, loc = detector.match_template(img, 'team_enabled', threshold=0.65)
+        matched, conf, loc = detector.match_template(img, 'team_enabled', threshold=TEMPLATE_THRESHOLDS['team_enabled'])
         return matched, 0
     
     # fallback: 像素偵測
-    roi = ROI.Team
-    intX = int(roi.cp1_x * img.width / 100)
-    intY1 = int(roi.cp1_y1 * img.height / 100)
-    intY2 = int(roi.cp1_y2 * img.height / 100)
-    
-    cnt = 0
-    total = intY2 - intY1
-    th = int(total / 3)  # 原本是 /2，改為 1/3 就過關
-    for intY in range(intY1, intY2):
-        rgb = getPixel(img, intX, intY, 255)
-        if rgb[0] > roi.cp1_rgb_threshold and rgb[1] > roi.cp1_rgb_threshold and rgb[2] > roi.cp1_rgb_threshold:
-            cnt += 1
-
-    isC1Matched = cnt > th
-
-    intX = int(roi.cp2_x * img.width / 100)
-    intY1 = int(roi.cp2_y1 * img.height / 100)
-    intY2 = int(roi.cp2_y2 * img.height / 100)
-
-    cnt = 0    
-    for intY in range(intY1, intY2):
-        rgb = getPixel(img, intX, intY, 255)
-        if rgb[0] > roi.cp1_rgb_threshold and rgb[1] > roi.cp1_rgb_threshold and rgb[2] > roi.cp1_rgb_threshold:
-            cnt += 1
-
-    isC2Matched = cnt > roi.cp2_min_count
-    return isC1Matched and isC2Matched, 0
+    arr = frameToArray(img) if arr is None else arr
+    return teamEnabledByPixel(arr, pixelROIOf(arr)), 0
 
 
 # ====== 組隊位置 ======
 
-def detectTeamPositionAvalible(img, teamPosition):
+def detectTeamPositionAvalible(img, teamPosition, arr=None):
     """偵測指定組隊位置是否有效"""
-    roi = ROI.TeamPosition
-    x = roi.x
-    
-    position = teamPosition
-    if position >= 1:
-        position -= 1
-    y = roi.base_y + roi.y_step * position
-            
-    matched = comparePointRGBSum(img, x, y, roi.rgb_sum_min, roi.rgb_sum_max, 0)
-    return matched
+    arr = frameToArray(img) if arr is None else arr
+    return teamPositionAvalibleByPixel(arr, pixelROIOf(arr), teamPosition)
 
 
 # ====== 道具/技能面板 ======
 
-def detectItemSkillPanelOpened(img):
+def detectItemSkillPanelOpened(img, arr=None):
     """偵測道具/技能面板是否開啟（模板 'panel_opened'）"""
     
     if detector.has_template('panel_opened'):
-        matched, conf, loc = detector.match_template(img, 'panel_opened', threshold=0.75)
+        matched, conf, loc = detector.match_template(img, 'panel_opened', threshold=TEMPLATE_THRESHOLDS['panel_opened'])
         return matched
     
-    roi = ROI.Panel
-    intX = int(roi.x * img.width / 100)
-    intY1 = int(roi.y1 * img.height / 100)
-    intY2 = int(roi.y2 * img.height / 100)
-    
-    cnt = 0
-    total = intY2 - intY1
-    for intY in range(intY1, intY2):
-        if (compareRGB(getPixel(img, intX, intY, -1), (25, 40), (15, 30), (10, 25)) 
-           or compareRGB(getPixel(img, intX, intY, -1), (15, 25), (15, 25), (15, 25))):
-            cnt += 1
-    
-    return cnt / total * 100 >= roi.match_threshold_pct
+    arr = frameToArray(img) if arr is None else arr
+    return panelOpenedByPixel(arr, pixelROIOf(arr))
 
 
 # ====== HP 偵測 ======
 
-def detectHPPercent(img, teamPosition, rgbValue):
+def detectHPPercent(img, teamPosition, rgbValue, arr=None):
     """偵測 HP 百分比及中毒狀態"""
-    roi = ROI.HP
-    cnt = 0
-    status_count = 0
-    intX1 = int(roi.x1 * img.width / 100)
-    intX2 = int(roi.x2 * img.width / 100)
-    
-    shiftUnit = 0
-    if teamPosition is not None:
-        shiftUnit = int(teamPosition)
-    if shiftUnit >= 1:
-        shiftUnit -= 1
-
-    yPercent = roi.base_y_offset + shiftUnit * roi.y_step
-    
-    y = int(yPercent * img.height / 100)
-    for x in range(intX1, intX2):
-        if comparePointRGB(img, x, y, roi.hp_r_range, roi.hp_g_range, roi.hp_b_range, -1):
-            cnt += 1
-        if comparePointRGB(img, x, y, roi.poison_r_range, roi.poison_g_range, roi.poison_b_range, -1):
-            status_count += 1
-             
-    hpPercent = int(cnt / (intX2 - intX1) * 100)
-    return hpPercent, status_count > 0
+    arr = frameToArray(img) if arr is None else arr
+    return hpPercentByPixel(arr, pixelROIOf(arr), teamPosition)
 
 
 # ====== MP 偵測 ======
 
-def detectMPPercent(img, teamPosition, rgbValue):
+def detectMPPercent(img, teamPosition, rgbValue, arr=None):
     """偵測 MP 百分比"""
-    roi = ROI.MP
-    cnt = 0
-    intX1 = int(roi.x1 * img.width / 100)
-    intX2 = int(roi.x2 * img.width / 100)
-    
-    shiftUnit = 0
-    if teamPosition is not None:
-        shiftUnit = int(teamPosition)
-    if shiftUnit >= 1:
-        shiftUnit -= 1
-        
-    yPercent = roi.base_y_offset + shiftUnit * roi.y_step
-    
-    y = int(yPercent * img.height / 100)
-    for x in range(intX1, intX2):
-        if comparePointRGB(img, x, y, roi.mp_r_range, roi.mp_g_range, roi.mp_b_range, rgbValue):
-            cnt += 1
-    
-    mpPercent = int(cnt / (intX2 - intX1) * 100)
-    return mpPercent
+    arr = frameToArray(img) if arr is None else arr
+    return mpPercentByPixel(arr, pixelROIOf(arr), teamPosition)
 
 
 # ====== 攻擊狀態 ======
 
-def detectIsAttack(img):
+def detectIsAttack(img, arr=None):
     """偵測是否正在攻擊（模板 'is_attack'）"""
     
     if detector.has_template('is_attack'):
-        matched, conf, loc = detector.match_template(img, 'is_attack', threshold=0.7)
+        matched, conf, loc = detector.match_template(img, 'is_attack', threshold=TEMPLATE_THRESHOLDS['is_attack'])
         return matched
     
-    roi = ROI.Attack
-    cnt = 0
-    intX1 = int(roi.x1 * img.width / 100)
-    intX2 = int(roi.x2 * img.width / 100)
-
-    y = int(roi.y * img.height / 100)    
-    for x in range(intX1, intX2):
-        rgb = getPixel(img, x, y, 255)
-        isAttck = (rgb[0] - rgb[1] > roi.r_minus_g_threshold) or (rgb[0] - rgb[2] > roi.r_minus_b_threshold)
-        if isAttck:
-            cnt += 1
-        y += 1
-    
-    attRate = cnt / (intX2 - intX1 + 1) * 100 
-    return attRate >= roi.rate_threshold
+    arr = frameToArray(img) if arr is None else arr
+    return isAttackByPixel(arr, pixelROIOf(arr))
 
 
 # ====== 被攻擊偵測 ======
 
-def detectIsAttacked(img):
+def detectIsAttacked(img, arr=None):
     """偵測是否被攻擊（模板 'is_attacked'）"""
     
     if detector.has_template('is_attacked'):
-        matched, conf, loc = detector.match_template(img, 'is_attacked', threshold=0.7)
+        matched, conf, loc = detector.match_template(img, 'is_attacked', threshold=TEMPLATE_THRESHOLDS['is_attacked'])
         return matched
     
-    roi = ROI.Attacked
-    
-    # 區域 1: 右下角
-    cnt = 0
-    area = 0
-    intX1 = int(roi.area1_x1 * img.width / 100)
-    intX2 = int(roi.area1_x2 * img.width / 100)
-    intY1 = int(roi.area1_y0 * img.height / 100)
-    intY2 = int((roi.area1_y0 + roi.area1_y_range) * img.height / 100)
-    
-    for x in range(intX1, intX2):        
-        for y in range(intY1, intY2):
-            rgb = getPixel(img, x, y, 255)
-            isAttcked = (rgb[0] > roi.area1_r_threshold) and (rgb[0] - rgb[1] > roi.area1_r_minus_g)
-            if isAttcked:
-                cnt += 1
-            area += 1
-    
-    attRate1 = cnt / area * 100 if area > 0 else 0
+    arr = frameToArray(img) if arr is None else arr
+    return isAttackedByPixel(arr, pixelROIOf(arr))
 
-    # 區域 2: 左上角
-    cnt = 0
-    intX1 = int(roi.area2_x1 * img.width / 100)
-    intX2 = int(roi.area2_x2 * img.width / 100)
-    y = int(roi.area2_y * img.height / 100)
-    for x in range(intX1, intX2):        
-        rgb = getPixel(img, x, y, 255)
-        isAttcked = (rgb[0] - rgb[1] > roi.area2_r_minus_g) or (rgb[0] - rgb[2] > roi.area2_r_minus_b)
-        if isAttcked:
-            cnt += 1
-
-    attedRate2 = cnt / (intX2 - intX1 + 1) * 100 if (intX2 - intX1 + 1) > 0 else 0
 
-    return (attRate1 > roi.area1_rate_threshold) and (attedRate2 > roi.area2_rate_threshold)
+# ====== 取樣點標示（debug overlay） ======
+
+PROBE_COLOR = (0, 255, 0)
+
+
+def drawProbeOverlay(img, geo, teamPosition=0, color=PROBE_COLOR):
+    """把所有取樣 ROI 一次塗在截圖副本上回傳（原圖不變），僅供預覽使用"""
+    out = np.array(frameToArray(img))
+    ys, xs = geo.probe_index(teamPosition)
+    out[ys, xs, :3] = color
+    return Image.fromarray(out)
 
 
 # ====== 底層工具函數 ======
 
+def frameToArray(img):
+    """Frame / PIL Image → RGB(A) ndarray；已是 ndarray 則原樣回傳"""
+    if isinstance(img, np.ndarray):
+        return img
+    if isinstance(img, Frame):
+        return img.rgb
+    return np.asarray(img)
+
+
+def frameToGray(img):
+    """Frame / RGB(A) ndarray → 灰階 ndarray（給模板比對共用；Frame 只轉一次）"""
+    if isinstance(img, Frame):
+        return img.gray
+    if img.ndim == 2:
+        return img
+    code = cv2.COLOR_RGBA2GRAY if img.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+    return cv2.cvtColor(img, code)
+
+
+def maskRGB(pixels, r_range, g_range, b_range):
+    """向量版 compareRGB：回傳 pixels (..., 3+) 各點是否落在 range 內的布林遮罩"""
+    r = pixels[..., 0]
+    g = pixels[..., 1]
+    b = pixels[..., 2]
+    return ((r >= r_range[0]) & (r <= r_range[1]) &
+            (g >= g_range[0]) & (g <= g_range[1]) &
+            (b >= b_range[0]) & (b <= b_range[1]))
+
+
 def comparePointRGBSum(img, x, y, rgb_bound1, rgb_bound2, overrideValue):
     """比較單點的 RGB 總和是否在指定範圍"""
     intX, intY = convertIntPosition(img, x, y)
@@ -249,14 +262,11 @@ def convertIntPosition(img, fX, fY):
 
 
 def getPixel(img, intX, intY, rgbValue):
-    """取得 img 裡的 pixel RGB（rgbValue >= 0 時會在圖上標記）"""
+    """取得 img 裡的 pixel RGB（唯讀；rgbValue == -2 時印出數值）"""
     rgb = img.getpixel((intX, intY))
     
     if rgbValue == -2:
         print(rgb)
-    
-    if rgbValue >= 0:
-        img.putpixel((intX, intY), (0, rgbValue, 0))
     return rgb
 
 
@@ -268,11 +278,11 @@ def compareRGB(rgb, r_range, g_range, b_range):
 
 
 def drawSquares(img, target_point, squares_size):
-    """在圖上畫方框標示 ROI"""
+    """在圖上畫方框標示 ROI（會直接修改 img，請傳入副本）"""
     t_x = target_point[0] / 1280.0 * img.width
     t_y = target_point[1] / 720.0 * img.height
     
-    for x in range(int(t_x - squares_size), int(t_x + squares_size)):
-        for y in range(int(t_y - squares_size), int(t_y + squares_size)):
-            getPixel(img, x, y, 255)
+    box = (int(t_x - squares_size), int(t_y - squares_size),
+           int(t_x + squares_size), int(t_y + squares_size))
+    img.paste((0, 255, 0), box)
     return 0
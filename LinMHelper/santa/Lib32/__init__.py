@@ -1,13 +1,16 @@
-import win32gui
 from re import search
-import win32con
-from win32ui import CreateDCFromHandle,CreateBitmap
 from numpy import frombuffer
-from cv2 import cvtColor,COLOR_BGR2RGB
-from PIL import Image
-from win32gui import FindWindowEx, PostMessage, SetForegroundWindow, SendMessage
 from time import sleep
+try:
+    import win32gui
+    import win32con
+    from win32ui import CreateDCFromHandle,CreateBitmap
+    from win32gui import FindWindowEx, PostMessage, SetForegroundWindow, SendMessage
+    HAS_WIN32 = True
+except ImportError:  # 非 Windows：只有 keyPos 可用，截圖改用 santa.frame_source 的重播來源
+    HAS_WIN32 = False
 from santa.logger import log
+from santa.frame import Frame, crop_window_image
 
 from sys import exc_info
 from ctypes.wintypes import WPARAM
@@ -68,32 +71,11 @@ def getWindow_Img(hwnd):
         log.error('複製圖層錯誤: %s', e)
         return None
     
-    # 將 bitmap 轉換成 np
+    # 將 bitmap 轉換成 np（BGRA，直接指向 bitmap 的 bytes，不複製）
     signedIntsArray = bmp.GetBitmapBits(True)
     imgArray = frombuffer(signedIntsArray, dtype='uint8')
     imgArray.shape = (height, width, 4)  # png，具有透明度的
     
-    imgArray = cvtColor(imgArray,COLOR_BGR2RGB)
-    
-    img=Image.fromarray(imgArray)
-    
-    # Crop Image , top 26 , left、right by case
-    area = None
-    if((img.height-26)/img.width < 0.55): #表示視窗放到最大
-        noxToolsWidth = 30
-        left_bound=(img.width - int((img.height-26)/0.5615) - noxToolsWidth)/2
-        right_bound = left_bound + noxToolsWidth
-        area=(left_bound,27,img.width-right_bound,img.height)
-        #area=(0,0,img.width,img.height)
-    else:
-        area=(0,27,img.width,img.height)
-    img=img.crop(area)
-    #print('croped image size=%d x %d , rate is: %f' % (img.width,img.height,img.height/img.width))
-    
-    if(img.width> 1000):
-        newWidth,newHeight = 1000 , int(img.height * (1000/img.width))
-        img=img.resize((newWidth,newHeight))
-    
     # 釋放device content
     srcdc.DeleteDC()
     memdc.DeleteDC()
@@ -106,8 +88,8 @@ def getWindow_Img(hwnd):
             win32gui.SystemParametersInfo(win32con.SPI_SETANIMATION, 1)
         except Exception:
             pass
-    # 回傳圖片
-    return img
+    # 裁切標題列/工具列並縮到寬 1000（純 NumPy，見 santa.frame.crop_window_image）
+    return Frame(crop_window_image(imgArray), 'BGRA')
 
 def getControlID(hwnd):
     id = FindWindowEx(hwnd,0,None,None)
@@ -1,13 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
 import queue
+import re
 from time import sleep
 from tkinter import StringVar
 from configparser import ConfigParser
 from os import listdir
 from fnmatch import filter
 from santa.PlayerThread import PlayerThread
-from santa.config import emulator_config
+from santa.boss_scheduler import BossScheduler
+from santa.config import emulator_config, runtime_config
+from santa.player_pool import PlayerPool
+from santa.player_process import ProcessHost
 from santa.logger import log
 from PIL.ImageTk import PhotoImage
 
@@ -44,7 +48,8 @@ FONT_ICON = (FONT_FAMILY, 11)
 
 
 class LinMHelperApp():
-    threadCount = 4
+    threadCount = 4  # Main.ini 沒有任何 PlayerN 區段時的預設玩家數（實際數量見 loadConfig）
+    cardHeight = 38  # 每張玩家卡片約略高度，玩家多時用來放大視窗
     
     def __init__(self):
         self.root = tk.Tk()
@@ -66,6 +71,9 @@ class LinMHelperApp():
         self.phImage = None
         self.phLabel = None
         self._statusDots = []  # 狀態指示燈
+        self.processHost = None  # process 執行模式的共用資源（thread 模式為 None）
+        self.playerPool = None   # pool 執行模式的共用 worker thread
+        self.playerSections = []  # 每位玩家對應的 Main.ini 區段名稱
         
         # Thread -> GUI 的通訊 queue
         self._gui_queue = queue.Queue()
@@ -98,6 +106,8 @@ class LinMHelperApp():
         # 世界王時段
         self.bossTimeList = ['12:00', '13:00', '19:00', '20:00', '21:00', '22:00']
         self.bossTimeVariable = []
+        # 全部玩家共用的世界王排程；勾選變更在主線程同步過去，worker thread 不碰 IntVar
+        self.bossScheduler = BossScheduler(self.bossTimeList)
         
         tk.Label(toolFrame, text='世界王', font=FONT_SMALL,
                  bg=COLORS['bg_toolbar'], fg=COLORS['fg_dim']).pack(side='left', padx=(12, 4))
@@ -113,6 +123,16 @@ class LinMHelperApp():
                                activeforeground=COLORS['fg'])
             cb.select()
             cb.pack(side='left', padx=1)
+            self.bossTimeVariable[i].trace_add(
+                'write', lambda *_, idx=i: self.bossScheduler.set_enabled(idx, self.bossTimeVariable[idx].get()))
+        self.bossScheduler.start()
+        
+        # 執行模式：thread（預設）、pool（共用固定數量的 thread）或每個玩家一個 worker process
+        runtime_config.load_from_ini('Main.ini')
+        if runtime_config.execution_mode == 'process':
+            self.processHost = ProcessHost(self._gui_queue, self.bossScheduler)
+        elif runtime_config.execution_mode == 'pool':
+            self.playerPool = PlayerPool(runtime_config.pool_workers)
         
         # 分隔線
         sep = tk.Frame(toolFrame, width=1, bg=COLORS['border'])
@@ -125,6 +145,9 @@ class LinMHelperApp():
                        selectcolor=COLORS['input_bg'],
                        activebackground=COLORS['bg_toolbar'],
                        activeforeground=COLORS['fg']).pack(side='left', padx=2)
+        if self.processHost is not None:
+            self.hideWindowVar.trace_add(
+                'write', lambda *_: setattr(self.processHost.hideWindow, 'value', self.hideWindowVar.get()))
         
         # 右側按鈕
         self._make_tool_button(toolFrame, '⏹ 全部停止', COLORS['red'], self._stop_all).pack(side='right', padx=(2, 12))
@@ -189,9 +212,15 @@ class LinMHelperApp():
                 elif msg_type == 'image':
                     _, i, img = msg
                     if i == self.showIndex:
-                        self.phImage = PhotoImage('RGBA', img.size)
-                        self.phImage.paste(img)
-                        self.phLabel.configure(image=self.phImage)
+                        self._show_preview(img)
+                
+                elif msg_type == 'frame':
+                    # process 模式：預覽圖在共享記憶體，訊息只帶 seq
+                    _, i, seq = msg
+                    if i == self.showIndex and self.processHost is not None:
+                        img = self.processHost.preview_image(i, seq)
+                        if img is not None:
+                            self._show_preview(img)
                 
                 elif msg_type == 'stop':
                     _, i = msg
@@ -209,6 +238,11 @@ class LinMHelperApp():
         
         self.root.after(100, self._poll_gui_queue)
     
+    def _show_preview(self, img):
+        self.phImage = PhotoImage('RGBA', img.size)
+        self.phImage.paste(img)
+        self.phLabel.configure(image=self.phImage)
+    
     def _on_status_update(self, i, text):
         self._gui_queue.put(('status', i, text))
     
@@ -274,21 +308,32 @@ class LinMHelperApp():
         btnToggle.pack(side='right', padx=2)
         self.btnList.append(btnToggle)
         
-        # 建立 PlayerThread
-        pThread = PlayerThread(
+        self.wThreads.append(self._create_player(i))
+    
+    def _create_player(self, i):
+        """依執行模式建立 PlayerThread / PooledPlayer / PlayerProcess（尚未啟動）"""
+        if self.processHost is not None:
+            return self.processHost.create(i, self.wNameList[i].get("1.0", "end-1c"),
+                                           self.wProfileVarList[i].get())
+        player = PlayerThread(
             i, self,
             on_status_update=self._on_status_update,
             on_image_update=self._on_image_update,
             get_running_state=self._get_running_state,
             get_hide_window=self._get_hide_window,
+            boss_scheduler=self.bossScheduler,
         )
-        self.wThreads.append(pThread)
+        if self.playerPool is not None:
+            return self.playerPool.wrap(player)
+        return player
     
     def _set_btn_running(self, i):
         self.btnList[i].configure(text='● 執行中', fg=COLORS['green'], bg=COLORS['green_bg'])
     
     def _set_btn_stopped(self, i):
         self.btnList[i].configure(text='○ 已停止', fg=COLORS['fg_dim'], bg=COLORS['input_bg'])
+        if self.processHost is not None and i < len(self.wThreads):
+            self.wThreads[i].stop()
 
     # ====== 執行中/已停止的切換 ======
     
@@ -301,13 +346,7 @@ class LinMHelperApp():
                 log.info('正在等待Thread-%d停止。', i)
                 sleep(2)
             
-            self.wThreads[i] = PlayerThread(
-                i, self,
-                on_status_update=self._on_status_update,
-                on_image_update=self._on_image_update,
-                get_running_state=self._get_running_state,
-                get_hide_window=self._get_hide_window,
-            )
+            self.wThreads[i] = self._create_player(i)
             self.wThreads[i].start()
         else:
             self._set_btn_stopped(i)
@@ -315,35 +354,54 @@ class LinMHelperApp():
     # ====== 載入設定 ======
     
     def loadConfig(self):
-        for i in range(self.threadCount):
-            self.newMonitor(i)
-
         self.config.read('Main.ini')
         emulator_config.load_from_ini('Main.ini')
+        
+        # 玩家數量由 Main.ini 的 Player0、Player1 ... 區段決定
+        self.playerSections = self._player_sections()
+        self.threadCount = len(self.playerSections)
+        for i in range(self.threadCount):
+            self.newMonitor(i)
+        if self.threadCount > LinMHelperApp.threadCount:
+            extra = (self.threadCount - LinMHelperApp.threadCount) * self.cardHeight
+            self.root.geometry('940x%d' % (350 + extra))
+        
         iniList = self.getIniList()
         
-        for i in range(self.threadCount):            
-            in_wName = self.config['Player' + str(i)]['windowName']
-            in_pName = self.config['Player' + str(i)]['profileName']
-            in_enabled = self.config['Player' + str(i)]['enabled']
+        for i, sectionName in enumerate(self.playerSections):
+            section = self.config[sectionName]
+            in_wName = section.get('windowName', '')
+            in_pName = section.get('profileName', '')
+            in_enabled = section.get('enabled', '0')
             
             self.wNameList[i].insert("1.0", in_wName)
             
             if in_pName in iniList:
                 self.wProfileVarList[i].set(in_pName)
+    
+    def _player_sections(self):
+        """Main.ini 的 PlayerN 區段（依 N 排序）；一個都沒有時建立預設的 threadCount 個"""
+        sections = [s for s in self.config.sections() if re.fullmatch(r'Player\d+', s)]
+        sections.sort(key=lambda s: int(s[len('Player'):]))
+        if not sections:
+            sections = ['Player%d' % i for i in range(self.threadCount)]
+            for s in sections:
+                self.config[s] = {'windowName': '', 'profileName': 'default.ini', 'enabled': '0'}
+        return sections
 
     # ====== 儲存設定並關閉 ======
     
     def on_closing(self):
-        for i in range(self.threadCount):
-            self.config['Player' + str(i)]['windowName'] = self.wNameList[i].get('1.0', 'end-1c')
-            self.config['Player' + str(i)]['profileName'] = self.wProfileVarList[i].get()
+        for i, sectionName in enumerate(self.playerSections):
+            self.config[sectionName]['windowName'] = self.wNameList[i].get('1.0', 'end-1c')
+            self.config[sectionName]['profileName'] = self.wProfileVarList[i].get()
             if '執行中' in self.btnList[i]['text']: 
-                self.config['Player' + str(i)]['enabled'] = '1'
+                self.config[sectionName]['enabled'] = '1'
             else: 
-                self.config['Player' + str(i)]['enabled'] = '0'
+                self.config[sectionName]['enabled'] = '0'
         
         emulator_config.save_defaults_to_ini(self.config)
+        runtime_config.save_defaults_to_ini(self.config)
         
         import os
         import tempfile
@@ -364,12 +422,18 @@ class LinMHelperApp():
         
         for i in range(self.threadCount):
             self._set_btn_stopped(i)
+        self.bossScheduler.close()
         
         import time
         deadline = time.time() + 5
         for t in self.wThreads:
             while t.is_alive() and time.time() < deadline:
                 sleep(0.5)
+        if self.playerPool is not None:
+            self.playerPool.close()
+        if self.processHost is not None:
+            # worker 都結束後才釋放共享記憶體，避免還在寫預覽的 worker 寫進已 unlink 的區段
+            self.processHost.close()
             
         self.root.destroy()
     
@@ -382,6 +446,8 @@ class LinMHelperApp():
             self.showIndex = -1
         else:
             self.showIndex = i
+        if self.processHost is not None:
+            self.processHost.showIndex.value = self.showIndex
     
     def _open_template_manager(self):
         import threading
@@ -1,32 +1,40 @@
-from santa.Lib32 import FindWindow_bySearch, getWindow_Img, getControlID,\
-    postMessage, getWindow_W_H, setWindowPosition
+from santa.Lib32 import HAS_WIN32, FindWindow_bySearch, getWindow_W_H, setWindowPosition
 from datetime import datetime, timedelta
-from PIL.ImageTk import PhotoImage
-from santa.ImageUtils import detectTeamEnabled, detectItemSkillPanelOpened, \
-    detectHPPercent, detectMPPercent, detectIsAttack, detectIsAttacked,\
-    detectTeamPositionAvalible, drawSquares
+from santa.frame import Frame
+from santa.frame_analyzer import FrameAnalyzer, FrameState
+from santa.frame_source import FrameSource, Win32FrameSource, create_capture_source
 from threading import Thread
 from configparser import ConfigParser
 from time import sleep,strftime
 from os import mkdir,path
-import subprocess
-from winsound import Beep
+try:
+    from winsound import Beep
+except ImportError:
+    Beep = None
 from calendar import weekday
 from santa.Lib32.keyPos import LinMKeySet, scale_pos, BASE_WIDTH, BASE_HEIGHT
+from santa.boss_quest import BossQuest
+from santa.boss_scheduler import BossScheduler
 from santa.config import emulator_config
+from santa.input_backends import create_input_backend
+from santa.input_dispatcher import InputDispatcher, PRIORITY_URGENT, PRIORITY_ESCAPE, \
+    PRIORITY_HEAL, PRIORITY_NORMAL
 from santa.logger import log
-import random
-from typing import Optional, Callable, Dict, Any, Tuple
+from santa.roi_config import ROI
+from santa.tick_scheduler import TickScheduler
+from typing import Optional, Callable, Dict, Any
 
 
 class PlayerThread(Thread):
-    beforeMinutes = 5
     
     def __init__(self, i: int, tkObj, on_status_update: Optional[Callable] = None,
                  on_image_update: Optional[Callable] = None, 
                  get_running_state: Optional[Callable] = None,
                  get_hide_window: Optional[Callable] = None,
-                 get_boss_config: Optional[Callable] = None):
+                 boss_scheduler: Optional[BossScheduler] = None,
+                 get_show_index: Optional[Callable] = None,
+                 frame_source: Optional[FrameSource] = None,
+                 wName: str = '', wProfile: str = ''):
         super(PlayerThread, self).__init__(name=f'Player-{i}')
         self.daemon = True
         self.profileConfig = ConfigParser()
@@ -34,17 +42,25 @@ class PlayerThread(Thread):
         self.i = i
         self.tkObj = tkObj  # 保留向後相容，但盡量不直接操作
         self.img = None
+        self._frame_source = frame_source  # None = 用 win32 截取 wName 視窗
+        self._input = None  # 輸入後端，第一次按鍵時建立（見 santa.input_backends）
+        self._dispatcher = None  # 非同步按鍵佇列，第一次按鍵時建立
+        self.scheduler = TickScheduler()  # 依狀態調整截圖頻率，scheduler.achieved_fps 為實際頻率
         
         # callback 函數，由 GUI 層注入
         self._on_status_update = on_status_update  # fn(i, text)
         self._on_image_update = on_image_update    # fn(i, img)
         self._get_running_state = get_running_state  # fn(i) -> bool
         self._get_hide_window = get_hide_window    # fn() -> bool
-        self._get_boss_config = get_boss_config    # fn() -> (bossTimeList, bossTimeVariable)
+        self._get_show_index = get_show_index      # fn() -> 正在預覽的玩家序號
+        self._boss_scheduler = boss_scheduler      # 共用的世界王排程（None = 不打世界王）
         
-        # 從 tkinter widget 讀取初始值（只在主線程建立時讀一次）
-        self._wName = tkObj.wNameList[i].get("1.0", "end-1c")
-        self._wProfile = tkObj.wProfileVarList[i].get()
+        # 從 tkinter widget 讀取初始值（只在主線程建立時讀一次；無 GUI 時用參數）
+        if tkObj is not None:
+            wName = tkObj.wNameList[i].get("1.0", "end-1c")
+            wProfile = tkObj.wProfileVarList[i].get()
+        self._wName = wName
+        self._wProfile = wProfile
         
         log.info('Thread-%d 初始化完成', i)
 
@@ -74,18 +90,37 @@ class PlayerThread(Thread):
         if self._get_hide_window:
             return self._get_hide_window()
         return self.tkObj.hideWindowVar.get() == 1
+    
+    def _is_previewed(self) -> bool:
+        """GUI 是否正在預覽這個玩家"""
+        if self._get_show_index:
+            return self._get_show_index() == self.i
+        return self.tkObj is not None and self.tkObj.showIndex == self.i
 
     # ====== 主要流程 ======
     
     def run(self):
-        ctx = self._init_session()
+        ctx = self.open_session()
         if ctx is None:
             return
         
+        while self.step(ctx):
+            sleep(ctx['scheduler'].remaining())
+    
+    def open_session(self) -> Optional[Dict[str, Any]]:
+        """開始掛機工作階段（run() 或 PlayerPool 呼叫），回傳 context dict 或 None"""
+        return self._init_session()
+    
+    def step(self, ctx) -> bool:
+        """
+        執行一個 tick；該停止（被停止、來源結束、崩潰）時收尾並回傳 False。
+        下一次呼叫的時間由 ctx['scheduler'] 決定。
+        """
+        if not self._is_running() or ctx['source'].finished:
+            self.close_session(ctx)
+            return False
         try:
-            while self._is_running():
-                sleep(ctx['sleepTime'])
-                self._tick(ctx)
+            self._tick(ctx)
         except Exception as e:
             log.error('Thread-%d 意外崩潰: %s', self.i, e, exc_info=True)
             self._update_status('❗ 執行錯誤: %s' % str(e)[:50])
@@ -95,6 +130,19 @@ class PlayerThread(Thread):
                     self.tkObj._gui_queue.put(('stop', self.i))
                 except Exception:
                     pass
+            self.close_session(ctx)
+            return False
+        return True
+    
+    def close_session(self, ctx) -> None:
+        """釋放截圖來源、按鍵佇列與輸入後端"""
+        ctx['source'].close()
+        if ctx['bossSub'] is not None:
+            self._boss_scheduler.unsubscribe(ctx['bossSub'])
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+        if self._input is not None:
+            self._input.close()
         
         self.stopped = True
         self._update_status('已停止偵測。')
@@ -105,20 +153,34 @@ class PlayerThread(Thread):
         self.loadProfile(self._wProfile)
         wName = self._wName
         
-        hwnd = FindWindow_bySearch(wName)
-        if hwnd is None:
-            log.warning('Thread-%d: 找不到視窗 [%s]', self.i, wName)
-            self._update_status('找不到視窗 [%s]' % wName)
-            return None
+        source = self._frame_source or create_capture_source(wName)
+        if source is None:
+            if not HAS_WIN32:
+                log.error('Thread-%d: 此平台不支援 win32 截圖，請指定 frame_source', self.i)
+                self._update_status('此平台不支援 win32 截圖')
+                return None
+            hwnd = FindWindow_bySearch(wName)
+            if hwnd is None:
+                log.warning('Thread-%d: 找不到視窗 [%s]', self.i, wName)
+                self._update_status('找不到視窗 [%s]' % wName)
+                return None
+            source = Win32FrameSource(hwnd)
+            log.info('Thread-%d: wName=%s, HWND=%d, profile=%s', self.i, wName, hwnd, self._wProfile)
+        else:
+            hwnd = None  # 重播 / adb 截圖不需要操作視窗
+            log.info('Thread-%d: wName=%s, source=%s, profile=%s',
+                     self.i, wName, type(source).__name__, self._wProfile)
         
-        log.info('Thread-%d: wName=%s, HWND=%d, profile=%s', self.i, wName, hwnd, self._wProfile)
+        teamPosition = self.readIntFromConfig('Common', 'TeamPosition')
         
         return {
             'hwnd': hwnd,
             'wName': wName,
-            'sleepTime': 1,
+            'source': source,
+            'scheduler': self.scheduler,
+            'analyzer': FrameAnalyzer(teamPosition),
             # 設定值
-            'teamPosition': self.readIntFromConfig('Common', 'TeamPosition'),
+            'teamPosition': teamPosition,
             'hpCure': self.readIntFromConfig('Thresholds', 'HpCure'),
             'mpTransHP': self.readIntFromConfig('Thresholds', 'MpTransHP'),
             'mpProtect': self.readIntFromConfig('Thresholds', 'MpProtect'),
@@ -138,10 +200,15 @@ class PlayerThread(Thread):
             'notAttackCnt': 0,
             'notAttackAlertTimes': 30,
             'darkCnt': 0,
+            # 世界王：排程通知的收件匣、進行中的流程
+            'bossSub': self._boss_scheduler.subscribe(self.i) if self._boss_scheduler else None,
+            'bossQuest': None,
         }
 
     def _tick(self, ctx):
         """單次迴圈迭代"""
+        scheduler = ctx['scheduler']
+        scheduler.begin()
         now = datetime.now()
         hwnd = ctx['hwnd']
         wName = ctx['wName']
@@ -150,40 +217,57 @@ class PlayerThread(Thread):
         self._check_boss(ctx, now)
         
         # Phase 2: 視窗顯示/隱藏
-        self._handle_window_visibility(hwnd)
+        if hwnd is not None:
+            self._handle_window_visibility(hwnd)
         
-        # Phase 3: 截圖
-        self.img = getWindow_Img(hwnd)
-        if self.img is None:
+        # Phase 3: 截圖（包成 Frame，整個 tick 共用同一份 ndarray / 灰階）
+        img = ctx['source'].read()
+        if img is None:
+            scheduler.plan('idle')  # 截圖失敗也要排下一次，不要空轉
             return
+        self.img = Frame.wrap(img)
         
         # Phase 4: 偵測畫面狀態
         state = self._detect_state(ctx)
         
         # Phase 5: 決定動作
-        action_info, new_sleep = self._decide_action(ctx, state, now)
-        ctx['sleepTime'] = new_sleep
+        action_info, tier, hold = self._decide_action(ctx, state, now)
+        scheduler.plan(tier, hold, state)
         
         # Phase 6: 輸出結果
-        endTime = datetime.now()
-        executeTime = (endTime - now).microseconds / 1000
+        executeTime = scheduler.elapsed() * 1000
         
-        hp = state.get('hp', -1)
-        mp = state.get('mp', -1)
-        fullInfo = 'HP:%03d，MP:%03d，共執行%d毫秒，' % (hp, mp, executeTime) + action_info
+        hp = state.hp
+        mp = state.mp
+        fullInfo = 'HP:%03d，MP:%03d，共執行%d毫秒，%.1f fps，' % (
+            hp, mp, executeTime, scheduler.achieved_fps) + action_info
+        if ctx['bossQuest'] is not None:
+            fullInfo = '世界王:%s，' % ctx['bossQuest'].step + fullInfo
         
-        # 更新截圖到 GUI
-        if self.i == self.tkObj.showIndex:
-            self._update_image(self.img)
+        # 更新截圖到 GUI（只有正在預覽這個玩家時才畫取樣標示，畫在副本上）
+        if self._is_previewed():
+            self._update_image(ctx['analyzer'].overlay(self.img))
         
         self._update_status(fullInfo)
 
     def _check_boss(self, ctx, now):
-        """檢查世界王時段"""
-        runBoss, weekDay, idx = self.isRunBoss()
-        if runBoss:
-            self.bossQuestRun(ctx['hwnd'], ctx['wName'], ctx['backHomeKey'], weekDay, idx)
+        """檢查世界王時段；副本流程由 BossQuest 每個 tick 推進一步，等待期間照常偵測"""
+        quest = ctx['bossQuest']
+        if quest is None:
+            slot = ctx['bossSub'].poll() if ctx['bossSub'] is not None else None
+            if slot is None or now >= slot.bossAt:
+                return
+            quest = ctx['bossQuest'] = BossQuest(slot.weekDay, slot.idx, ctx['backHomeKey'], now,
+                                                 bossAt=slot.bossAt)
+        
+        wasInDungeon = quest.inDungeon
+        for key, priority in quest.advance(now):
+            self.pressKey(ctx['hwnd'], ctx['wName'], key, priority)
+        if quest.inDungeon and not wasInDungeon:
+            # 進副本後 10 分鐘內不回捲
             ctx['lastHomeTeleport'] = now + timedelta(minutes=10)
+        if quest.done:
+            ctx['bossQuest'] = None
 
     def _handle_window_visibility(self, hwnd):
         """處理視窗顯示/隱藏"""
@@ -194,46 +278,34 @@ class PlayerThread(Thread):
         elif not isHide and x >= 8000 and y >= 8000:
             setWindowPosition(hwnd, x - 10000, y - 10000, width, height)
 
-    def _detect_state(self, ctx):
-        """偵測當前畫面狀態，回傳 state dict"""
-        state = {
-            'hp': -1,
-            'mp': -1,
-            'isPosion': False,
-            'isTeamEnabled': False,
-            'isGrey': 0,
-            'isRightPanelOpened': False,
-            'isAttack': False,
-            'isAttacked': False,
-        }
-        
-        state['isTeamEnabled'], state['isGrey'] = detectTeamEnabled(self.img)
-        state['isRightPanelOpened'] = detectItemSkillPanelOpened(self.img)
-        state['isAttacked'] = detectIsAttacked(self.img)
-        
-        teamPosition = ctx['teamPosition']
-        
-        if state['isTeamEnabled'] and not state['isRightPanelOpened']:
-            if detectTeamPositionAvalible(self.img, teamPosition):
-                state['hp'], state['isPosion'] = detectHPPercent(self.img, teamPosition, 255)
-                state['mp'] = detectMPPercent(self.img, teamPosition, 255)
-            elif detectTeamPositionAvalible(self.img, 0):
-                state['hp'], state['isPosion'] = detectHPPercent(self.img, 0, 255)
-                state['mp'] = detectMPPercent(self.img, 0, 255)
-            
-            state['isAttack'] = detectIsAttack(self.img)
-        
+    def _detect_state(self, ctx) -> FrameState:
+        """偵測當前畫面狀態（單次掃描共用 ndarray / 灰階 / 像素 ROI，區域沒變的偵測沿用上次結果）"""
+        analyzer = ctx['analyzer']
+        state = analyzer.analyze(self.img)
+        log.debug('Thread-%d: 偵測沿用 %d 項、執行 %d 項（累計沿用 %d / %d）', self.i,
+                  analyzer.saved, analyzer.evaluated,
+                  analyzer.totalSaved, analyzer.totalSaved + analyzer.totalEvaluated)
         return state
 
     def _decide_action(self, ctx, state, now):
-        """根據狀態決定動作，回傳 (infoText, sleepTime)"""
+        """
+        根據狀態決定動作，回傳 (infoText, tier, hold)。
+        tier 為 TICK_RATES 的狀態（決定下一張截圖的目標 fps），
+        hold 為至少要等的秒數（瞬移、施法動畫期間不重複施放）。
+        """
         hwnd = ctx['hwnd']
         wName = ctx['wName']
         info = ""
-        sleepTime = 1  # 預設
         
-        hp = state['hp']
-        mp = state['mp']
+        hp = state.hp
+        mp = state.mp
+
+        # === 黑畫面（瞬移、讀取、換地圖）：不做任何判斷，連續越久截圖越慢 ===
+        if state.isDark:
+            ctx['darkCnt'] += 1
+            info = "畫面全黑或讀取中（連續%d張），暫不動作。" % ctx['darkCnt']
+            return info, 'dark', self._dark_backoff(ctx['darkCnt'])
+        ctx['darkCnt'] = 0
 
         # === 終極保命：回捲判斷優先級最高 ===
         # (避免血量已經見底時，遭玩家攻擊卻飛走而非回村)
@@ -242,94 +314,96 @@ class PlayerThread(Thread):
 
         # === 被攻擊處理 (防PVP) ===
         # 修正: 原本誤用 lastHomeTeleport 計時，導致不斷施放瞬移
-        if state['isAttacked'] and (now - ctx['lastRndTeleport']).total_seconds() > 3:
-            self.pressKey(hwnd, wName, ctx['teleportKey'])
+        if state.isAttacked and (now - ctx['lastRndTeleport']).total_seconds() > 3:
+            self.pressKey(hwnd, wName, ctx['teleportKey'], PRIORITY_ESCAPE)
             info += "被打囉，執行瞬移避難。"
             self.logToConsole(info)
             ctx['lastRndTeleport'] = now
-            return info, 1.5  # 瞬移後停頓等待畫面過渡，不執行其他魔法
+            return info, 'danger', 1.5  # 瞬移後停頓等待畫面過渡，不執行其他魔法
         else:
             ctx['lastNotAttacked'] = now
         
         # === 無法偵測狀態 ===
-        if not (state['isTeamEnabled'] and not state['isRightPanelOpened']):
-            if not state['isTeamEnabled']:
+        if not (state.isTeamEnabled and not state.isRightPanelOpened):
+            if not state.isTeamEnabled:
                 info = "無法偵測組隊狀態"
-            if state['isRightPanelOpened']:
+            if state.isRightPanelOpened:
                 info = "道具或技能欄打開"
             info += "暫不動作。"
             ctx['notAttackCnt'] += 1
-            return info, 2
+            return info, 'blocked', 0.0
         
         # === 戰鬥邏輯 ===
-        info += "戰鬥狀態:%r," % state['isAttack']
+        info += "戰鬥狀態:%r," % state.isAttack
         
         # 解毒
-        if state['isPosion']:
-            self.pressKey(hwnd, wName, ctx['cureKey'])
+        if state.isPosion:
+            self.pressKey(hwnd, wName, ctx['cureKey'], PRIORITY_HEAL)
             info += "解毒。"
-            return info, sleepTime
+            return info, 'active', 0.0
         
         # 治癒（非騎士）
         if hp < ctx['hpCure'] and hp > 0 and ctx['role'] != 'KNIGHT':
             if mp > 5:
-                self.pressKey(hwnd, wName, ctx['cureKey'])
+                self.pressKey(hwnd, wName, ctx['cureKey'], PRIORITY_HEAL)
                 info += "施放治癒魔法。"
-                return info, 0
+                return info, 'danger', 0.0
         
         # 攻擊魔法
-        if mp >= ctx['mpProtect'] and state['isAttack']:
+        if mp >= ctx['mpProtect'] and state.isAttack:
             self.pressKey(hwnd, wName, ctx['majorAttackKey'])
             info += "施放攻擊魔法。"
-            return info, 0.4
+            return info, 'combat', 0.0
         
         # 妖精非戰鬥時魂體轉換
         # 修正: 增加 HP 安全門檻檢查，避免非戰鬥血太少時一直洗魂體導致意外死亡
-        if not state['isAttack'] and mp < 90 and ctx['role'] == 'ELF' and mp >= 0 and hp >= ctx['mpTransHP']:
+        if not state.isAttack and mp < 90 and ctx['role'] == 'ELF' and mp >= 0 and hp >= ctx['mpTransHP']:
             self.pressKey(hwnd, wName, ctx['transHpKey'])
             info += "MP<90%，施放魂體轉換。"
-            return info, 1.4
+            return info, 'idle', 1.4
         
         # MP 不足時魂體轉換
         if mp < ctx['mpProtect'] and mp < 90 and hp >= ctx['mpTransHP']:
             self.pressKey(hwnd, wName, ctx['transHpKey'])
             info += "施放魂體轉換。"
-            return info, 1.4
+            return info, 'idle', 1.4
         
         # 什麼都不做
         info += "啥也不做。"
-        return info, 0.5
+        return info, 'idle', 0.0
+
+    @staticmethod
+    def _dark_backoff(darkCnt: int) -> float:
+        """連續黑畫面時的等待秒數：前幾張維持短間隔，之後每張加倍直到上限"""
+        roi = ROI.Dark
+        return min(roi.backoff_max_sec, roi.poll_sec * 2 ** max(0, darkCnt - roi.backoff_after))
 
     def _action_back_home(self, ctx, state, now, info):
         """執行回捲動作"""
         hwnd = ctx['hwnd']
         wName = ctx['wName']
         
-        self.pressKey(hwnd, wName, ctx['backHomeKey'])
-        info += "點擊回捲。"
-        
-        if state['isAttacked']:
-            for bh in range(4):
-                self.pressKey(hwnd, wName, ctx['backHomeKey'])
-                self.logToConsole("backHome - PVP %r" % bh)
-                sleep(0.5)
+        # 被攻擊時連按 5 次（間隔 0.5 秒由按鍵佇列處理，不卡住偵測）
+        if state.isAttacked:
+            self.pressKey(hwnd, wName, ctx['backHomeKey'], PRIORITY_URGENT, repeat=5, interval=0.5)
+            self.logToConsole("backHome - PVP x5")
         else:
+            self.pressKey(hwnd, wName, ctx['backHomeKey'], PRIORITY_URGENT)
             self.logToConsole("backHome")
+        info += "點擊回捲。"
         
         self.logToConsole(info)
         ctx['lastHomeTeleport'] = now
         self.doBeep(5)
         
-        return info, 1
+        return info, 'danger', 0.0
 
     # ====== 工具方法 ======
 
     def pvpBackHome(self, hwnd, wName, backHomeKey, isAttacked, execTimes):
         if isAttacked:
-            for bh in range(execTimes):
-                self.pressKey(hwnd, wName, backHomeKey)
-                self.logToConsole("backHome - PVP %r" % bh)
-                sleep(0.5)
+            self.pressKey(hwnd, wName, backHomeKey, PRIORITY_URGENT, repeat=execTimes, interval=0.5)
+            self.logToConsole("backHome - PVP x%d" % execTimes)
 
     # 必要的 profile key——缺少時用預設值
     REQUIRED_KEYS = {
@@ -377,8 +451,11 @@ class PlayerThread(Thread):
         imgName = 'LinMOut/' + wName + "_" + imgType + '_' + nowStr
         img.save(imgName, "PNG")
 
-    def pressKey(self, hwnd, wName, key):
-        self.adb_tap(wName, key)
+    def pressKey(self, hwnd, wName, key, priority=PRIORITY_NORMAL, repeat=1, interval=0.0):
+        """排入按鍵後立即返回，由按鍵佇列的 worker 依優先度送出"""
+        if self._dispatcher is None:
+            self._dispatcher = InputDispatcher(lambda k: self.adb_tap(wName, k), name=self.name)
+        self._dispatcher.submit(key, priority, repeat, interval)
 
     def adb_tap(self, wName, pos):
         keyDict = {
@@ -395,27 +472,9 @@ class PlayerThread(Thread):
         if isinstance(pos, LinMKeySet) and pos is not None:
             # 使用 emulator_config 的解析度做座標縮放
             x, y = scale_pos(pos, emulator_config.base_width, emulator_config.base_height)
-            execCmd = emulator_config.build_adb_tap_cmd(wName, x, y)
-            try:
-                result = subprocess.run(execCmd, shell=True, capture_output=True, text=True, timeout=10)
-                rst = result.stdout.strip()
-                if rst and rst[0:5] == 'error':
-                    log.error('ADB error: %s', rst)
-                    # 安全截取 IP 避免分割錯誤
-                    import re
-                    match = re.search(r'([\d\.]+:[\d]+)', rst)
-                    if match:
-                        ipAddr = match.group(1)
-                        log.info('嘗試重新連線: %s', ipAddr)
-                        reconnectCmd = emulator_config.build_adb_connect_cmd(ipAddr)
-                        reconnResult = subprocess.run(reconnectCmd, shell=True, capture_output=True, text=True, timeout=10)
-                        log.info('重連結果: %s', reconnResult.stdout.strip())
-                    else:
-                        log.error('無法從 ADB 錯誤中解析出 IP 位址')
-            except subprocess.TimeoutExpired:
-                log.warning('adb_tap 逾時: %s', wName)
-            except Exception as e:
-                log.error('adb_tap 錯誤: %s', e)
+            if self._input is None:
+                self._input = create_input_backend(wName)
+            self._input.tap(x, y)
         else:
             log.warning('adb_tap 無效按鍵: %s', pos)
     
@@ -424,61 +483,11 @@ class PlayerThread(Thread):
         t.start()
     
     def beep(self, cnt):
+        if Beep is None:
+            return
         for i in range(cnt):
             Beep(1500, 100)
             sleep(0.4)
 
     def logToConsole(self, msg: str) -> None:
         log.info(msg)
-        
-    def bossQuestRun(self, hwnd, wName: str, backHomeKey, weekDay: int, idx: int) -> None:
-        log.info('進入副本腳本，先按回捲') 
-        self.pressKey(hwnd, wName, backHomeKey)        
-        log.info('避免村莊lag，等個 10sec + 亂數')
-        sleep(10 + random.randint(0, 10))
-        
-        if weekDay in [4] and idx in [5]:
-            self.pressKey(hwnd, wName, LinMKeySet.bossQuest2)        
-        else:
-            self.pressKey(hwnd, wName, LinMKeySet.bossQuest)
-        sleep(3)
-        log.info('點擊確認')
-        self.pressKey(hwnd, wName, LinMKeySet.key2)
-        
-        log.info('等待世界王開始')
-        while self._is_running():
-            sleep(10)
-            min_val = int(datetime.now().strftime('%M'))
-            if min_val == 0:
-                self.pressKey(hwnd, wName, LinMKeySet.autoBtn)
-                break
-        
-        if not self._is_running():
-            log.info('等待世界王期間被停止')
-            return
-            
-        log.info('開始打王！結束腳本')
-
-    def isRunBoss(self) -> Tuple[bool, Optional[int], Optional[int]]:
-        now = datetime.now()
-        m = int(now.strftime('%M'))
-        s = int(now.strftime('%S'))
-        weekDay = now.weekday()
-        runBoss = 0
-        idx = None
-        
-        if m == (60 - self.beforeMinutes) and 5 <= s <= 10:
-            nextBossTimeStr = (now + timedelta(minutes=self.beforeMinutes)).strftime('%H:%M')           
-            try:
-                idx = self.tkObj.bossTimeList.index(nextBossTimeStr)
-                runBoss = self.tkObj.bossTimeVariable[idx].get()
-                
-                if idx in [2, 3] and weekDay == 6:
-                    runBoss = 0
-            except Exception:
-                runBoss = 0
-        
-        if runBoss == 0:
-            return False, None, None
-        else:
-            return True, weekDay, idx
@@ -0,0 +1,241 @@
+"""
+ADB host protocol client — 直接用 socket 跟本機的 adb server（TCP 5037）說話，
+點擊、截圖、查詢裝置都不必再啟動 nox_adb.exe / NoxConsole.exe。
+
+協定重點:
+    request = 4 碼十六進位長度 + 內容，例如 b'000chost:version'
+    回覆    = b'OKAY' 或 b'FAIL' + 4 碼長度 + 錯誤訊息
+    host:transport:<serial> 成功後，同一條連線就轉接到該裝置，接著送 shell: / exec-out:
+
+使用方式:
+    client = AdbClient()
+    client.devices()                          # [('127.0.0.1:62001', 'device')]
+    client.shell(serial, 'getprop ro.product.model')
+    client.exec_out(serial, 'screencap')      # bytes（binary-safe）
+    client.device(serial).tap(100, 200)       # 每台裝置共用一條常駐 shell 連線
+"""
+import socket
+import subprocess
+from threading import Lock, Thread
+
+from santa.config import emulator_config
+from santa.logger import log
+
+DEFAULT_PORT = 5037
+
+
+class AdbError(Exception):
+    """adb server 回覆 FAIL 或協定錯誤"""
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise AdbError('adb server 提早關閉連線')
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_all(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+class AdbClient:
+    """adb server 的 socket client；裝置層級的常駐連線放在 device() 回傳的 AdbDevice 裡共用"""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._devices = {}
+        self._lock = Lock()
+        self._serverStarted = False
+
+    # ====== 底層協定 ======
+
+    def _connect(self):
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except ConnectionRefusedError:
+            # adb server 還沒啟動：用 nox_adb 啟動一次（之後都不再 spawn）
+            if self._serverStarted or self.host not in ('127.0.0.1', 'localhost'):
+                raise
+            self._start_server()
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _start_server(self):
+        self._serverStarted = True
+        log.info('adb server 未啟動，執行 start-server')
+        subprocess.run([emulator_config.nox_adb_path, 'start-server'], capture_output=True, timeout=15,
+                       creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+
+    @staticmethod
+    def _request(sock, payload):
+        """送出一個 request 並確認 OKAY；FAIL 時丟出 AdbError"""
+        data = payload.encode('utf-8')
+        sock.sendall(b'%04x' % len(data) + data)
+        status = _recv_exact(sock, 4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            raise AdbError(_recv_exact(sock, int(_recv_exact(sock, 4), 16)).decode('utf-8', 'replace'))
+        raise AdbError('未知的回覆: %r' % status)
+
+    @staticmethod
+    def _read_string(sock):
+        return _recv_exact(sock, int(_recv_exact(sock, 4), 16)).decode('utf-8', 'replace')
+
+    def _host_query(self, payload):
+        """host:* 查詢：OKAY 後接一段長度前綴的字串"""
+        with self._connect() as sock:
+            self._request(sock, payload)
+            return self._read_string(sock)
+
+    def open_service(self, serial, service):
+        """切換到裝置後開啟 service，回傳已接上資料串流的 socket（呼叫端負責關閉）"""
+        sock = self._connect()
+        try:
+            self._request(sock, 'host:transport:' + serial)
+            self._request(sock, service)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    # ====== host 服務 ======
+
+    def version(self):
+        return int(self._host_query('host:version'), 16)
+
+    def devices(self):
+        """[(serial, state), ...]"""
+        text = self._host_query('host:devices')
+        return [tuple(line.split('\t', 1)) for line in text.splitlines() if '\t' in line]
+
+    def connect_device(self, address):
+        """等同 `adb connect <address>`，回傳 server 的訊息"""
+        return self._host_query('host:connect:' + address)
+
+    # ====== 裝置服務 ======
+
+    def shell(self, serial, command):
+        """執行一次 shell 指令並回傳輸出（str）"""
+        with self.open_service(serial, 'shell:' + command) as sock:
+            return _recv_all(sock).decode('utf-8', 'replace')
+
+    def exec_out(self, serial, command):
+        """exec-out: 執行指令並回傳原始 bytes（不經過 pty，適合 screencap）"""
+        with self.open_service(serial, 'exec-out:' + command) as sock:
+            return _recv_all(sock)
+
+    def device(self, serial):
+        """取得（並快取）該裝置的 AdbDevice"""
+        with self._lock:
+            dev = self._devices.get(serial)
+            if dev is None:
+                dev = AdbDevice(self, serial)
+                self._devices[serial] = dev
+            return dev
+
+    def close(self):
+        with self._lock:
+            for dev in self._devices.values():
+                dev.close()
+            self._devices.clear()
+
+
+class AdbDevice:
+    """單一裝置：維持一條常駐的 `shell:sh` 串流，點擊只是寫一行指令"""
+
+    def __init__(self, client, serial):
+        self.client = client
+        self.serial = serial
+        self._sock = None
+        self._drainer = None
+        self._lock = Lock()
+
+    def _open(self):
+        try:
+            sock = self.client.open_service(self.serial, 'shell:sh')
+        except AdbError as e:
+            # 模擬器斷線時 server 回 "device '...' not found"：先 connect 再試一次
+            if ':' not in self.serial:
+                raise
+            log.info('嘗試重新連線: %s (%s)', self.serial, e)
+            log.info('重連結果: %s', self.client.connect_device(self.serial))
+            sock = self.client.open_service(self.serial, 'shell:sh')
+        sock.settimeout(None)
+        self._drainer = Thread(target=self._drain, args=(sock,), name=f'adb-{self.serial}', daemon=True)
+        self._drainer.start()
+        return sock
+
+    def _drain(self, sock):
+        """把 shell 的輸出讀掉，避免 buffer 滿了卡住裝置端"""
+        try:
+            for line in sock.makefile('rb'):
+                text = line.decode('utf-8', 'replace').strip()
+                if text:
+                    log.warning('adb shell [%s]: %s', self.serial, text)
+        except OSError:
+            pass
+
+    def run(self, command):
+        """在常駐 shell 寫入一行指令（不等待結果）；斷線時重開一次"""
+        data = (command + '\n').encode('utf-8')
+        with self._lock:
+            # drain thread 結束代表裝置端已關閉串流，寫入可能不會立刻報錯，直接重開
+            if self._sock is not None and not self._drainer.is_alive():
+                self._shutdown()
+            for attempt in range(2):
+                if self._sock is None:
+                    self._sock = self._open()
+                try:
+                    self._sock.sendall(data)
+                    return
+                except OSError:
+                    self._shutdown()
+                    if attempt:
+                        raise
+
+    def tap(self, x, y):
+        self.run('input tap %d %d' % (x, y))
+
+    def _shutdown(self):
+        """關閉串流（drain thread 持有 makefile，需 shutdown 才會真的斷開）"""
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._sock = None
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.sendall(b'exit\n')
+                except OSError:
+                    pass
+                self._shutdown()
+
+
+_client = None
+_client_lock = Lock()
+
+
+def get_client():
+    """全域共用的 AdbClient（所有玩家共用，裝置連線依 serial 區分）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AdbClient(port=emulator_config.adb_server_port)
+        return _client
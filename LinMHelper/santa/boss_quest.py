@@ -0,0 +1,78 @@
+"""
+世界王副本流程 — 取代 bossQuestRun 裡的 sleep，改成由 _tick 每次推進一步的狀態機。
+等待期間截圖、補血、回捲照常執行，不再整整卡住五分鐘。
+
+    back_home → (10~20 秒，避免村莊 lag) → quest → (3 秒) → confirm → (整點) → auto → done
+
+使用方式:
+    quest = BossQuest(slot.weekDay, slot.idx, backHomeKey, now, bossAt=slot.bossAt)
+    # 每個 tick:
+    for key, priority in quest.advance(now):
+        player.pressKey(hwnd, wName, key, priority)
+    if quest.done: ...
+"""
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from santa.input_dispatcher import PRIORITY_URGENT, PRIORITY_NORMAL
+from santa.Lib32.keyPos import LinMKeySet
+from santa.logger import log
+
+
+class BossQuest:
+    """單一玩家單一場世界王的流程；每一步只在 deadline 到了才送出按鍵"""
+
+    LAG_WAIT_SEC = (10, 20)   # 回村後等待秒數（含亂數）
+    CONFIRM_WAIT_SEC = 3      # 點副本後等確認視窗出現
+
+    def __init__(self, weekDay: int, idx: int, backHomeKey, now: datetime,
+                 bossAt: Optional[datetime] = None):
+        self.weekDay = weekDay
+        self.idx = idx
+        self.backHomeKey = backHomeKey
+        # 底比斯圖示出現時（週五第 6 個時段），世界王按鈕位置不同
+        self.questKey = LinMKeySet.bossQuest2 if weekDay == 4 and idx == 5 else LinMKeySet.bossQuest
+        # 未指定時為下一個整點
+        self.bossAt = bossAt or now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        self.step = 'back_home'
+        self.deadline = now
+
+    @property
+    def done(self) -> bool:
+        return self.step == 'done'
+
+    @property
+    def inDungeon(self) -> bool:
+        """已點確認進入副本（之後不要再回捲）"""
+        return self.step in ('wait', 'done')
+
+    def advance(self, now: datetime) -> List[Tuple[list, int]]:
+        """deadline 到了就前進一步，回傳這次要送出的 [(key, priority), ...]"""
+        if self.done or now < self.deadline:
+            return []
+
+        if self.step == 'back_home':
+            log.info('進入副本腳本，先按回捲')
+            lag = random.randint(*self.LAG_WAIT_SEC)
+            log.info('避免村莊lag，等個 %d 秒', lag)
+            self._next('quest', now + timedelta(seconds=lag))
+            return [(self.backHomeKey, PRIORITY_URGENT)]
+
+        if self.step == 'quest':
+            self._next('confirm', now + timedelta(seconds=self.CONFIRM_WAIT_SEC))
+            return [(self.questKey, PRIORITY_NORMAL)]
+
+        if self.step == 'confirm':
+            log.info('點擊確認，等待世界王開始（%s）', self.bossAt.strftime('%H:%M'))
+            self._next('wait', self.bossAt)
+            return [(LinMKeySet.key2, PRIORITY_NORMAL)]
+
+        # wait：整點到了
+        log.info('開始打王！結束腳本')
+        self._next('done', now)
+        return [(LinMKeySet.autoBtn, PRIORITY_NORMAL)]
+
+    def _next(self, step, deadline):
+        self.step = step
+        self.deadline = deadline
@@ -0,0 +1,140 @@
+"""
+世界王排程 — 全部玩家共用一個 thread，預先算好下一個觸發時間，時間到時對每個訂閱的
+玩家各發一次事件。玩家的 tick 只需檢查自己的收件匣（O(1)），不再每張截圖 strftime、
+也不在 worker thread 讀 Tk 的 IntVar。
+
+    觸發時間 = 世界王時間 - beforeMinutes + 5 秒（與原本 xx:55:05~10 的判斷相同）
+    週日 (weekday 6) 不打第 3、4 個時段（idx 2、3）
+    同一個時段只觸發一次；排程 thread 晚醒（系統忙碌、睡眠恢復）時，觸發後 60 秒內仍會補發
+
+使用方式:
+    scheduler = BossScheduler(['12:00', '13:00', ...])
+    scheduler.set_enabled(2, False)          # GUI 勾選變更時（主線程）呼叫
+    scheduler.start()
+
+    sub = scheduler.subscribe(i)             # PlayerThread
+    slot = sub.poll()                        # 每個 tick：沒有事件回傳 None
+    if slot: BossQuest(slot.weekDay, slot.idx, ..., bossAt=slot.bossAt)
+    scheduler.unsubscribe(sub)
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from queue import SimpleQueue
+from threading import Condition, Thread
+from typing import Callable, List, Optional
+
+from santa.logger import log
+
+BossSlot = namedtuple('BossSlot', ['bossAt', 'idx', 'weekDay'])
+
+SUNDAY_SKIP_IDX = (2, 3)  # 週日沒有的時段
+
+
+class BossSubscription:
+    """單一玩家的收件匣"""
+
+    def __init__(self, i: int):
+        self.i = i
+        self._inbox = SimpleQueue()
+
+    def poll(self) -> Optional[BossSlot]:
+        """取出一個觸發事件；沒有時回傳 None"""
+        if self._inbox.empty():
+            return None
+        return self._inbox.get_nowait()
+
+    def _deliver(self, slot: BossSlot) -> None:
+        self._inbox.put(slot)
+
+
+class BossScheduler(Thread):
+    """依世界王時段表排程的背景 thread"""
+
+    beforeMinutes = 5
+    TRIGGER_OFFSET_SEC = 5   # 提早 beforeMinutes 分鐘後再多等幾秒
+    LATE_LIMIT_SEC = 60      # 超過觸發時間 60 秒內仍補發
+
+    def __init__(self, bossTimeList: List[str], clock: Callable[[], datetime] = datetime.now):
+        super().__init__(name='BossScheduler', daemon=True)
+        self.bossTimeList = list(bossTimeList)
+        self._times = [tuple(int(v) for v in t.split(':')) for t in self.bossTimeList]
+        self._enabled = [True] * len(self.bossTimeList)
+        self._clock = clock
+        self._subscribers = []
+        self._lastFired = None  # 最近一次觸發的 bossAt
+        self._cond = Condition()
+        self._closed = False
+
+    # ====== 設定 / 訂閱（任何 thread 皆可呼叫） ======
+
+    def set_enabled(self, idx: int, enabled: bool) -> None:
+        with self._cond:
+            self._enabled[idx] = bool(enabled)
+            self._cond.notify()
+
+    def subscribe(self, i: int) -> BossSubscription:
+        return self.add_subscription(BossSubscription(i))
+
+    def add_subscription(self, sub: BossSubscription) -> BossSubscription:
+        """加入自訂的收件匣（例如覆寫 _deliver 轉送到 worker process 的 queue）"""
+        with self._cond:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: BossSubscription) -> None:
+        with self._cond:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    # ====== 排程 ======
+
+    def trigger_time(self, slot: BossSlot) -> datetime:
+        return slot.bossAt - timedelta(minutes=self.beforeMinutes) + timedelta(seconds=self.TRIGGER_OFFSET_SEC)
+
+    def next_slot(self, now: datetime) -> Optional[BossSlot]:
+        """下一個還沒觸發、仍來得及參加的時段（需持有 _cond 或在單執行緒下呼叫）"""
+        best = None
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        for day in range(8):
+            date = today + timedelta(days=day)
+            for idx, (h, m) in enumerate(self._times):
+                if not self._enabled[idx]:
+                    continue
+                if date.weekday() == 6 and idx in SUNDAY_SKIP_IDX:
+                    continue
+                slot = BossSlot(date.replace(hour=h, minute=m), idx, date.weekday())
+                if self.trigger_time(slot) + timedelta(seconds=self.LATE_LIMIT_SEC) < now:
+                    continue
+                if self._lastFired is not None and slot.bossAt <= self._lastFired:
+                    continue
+                if best is None or slot.bossAt < best.bossAt:
+                    best = slot
+            if best is not None:
+                return best
+        return None
+
+    def run(self):
+        with self._cond:
+            while not self._closed:
+                now = self._clock()
+                slot = self.next_slot(now)
+                if slot is None:
+                    self._cond.wait(60)
+                    continue
+                wait = (self.trigger_time(slot) - now).total_seconds()
+                if wait > 0:
+                    # 最多等 60 秒就重算一次（系統時間調整、睡眠後恢復）
+                    self._cond.wait(min(wait, 60))
+                    continue
+                self._fire(slot)
+
+    def _fire(self, slot: BossSlot) -> None:
+        self._lastFired = slot.bossAt
+        log.info('世界王 %s 即將開始，通知 %d 位玩家', slot.bossAt.strftime('%H:%M'), len(self._subscribers))
+        for sub in self._subscribers:
+            sub._deliver(slot)
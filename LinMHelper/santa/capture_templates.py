@@ -13,6 +13,7 @@ import numpy as np
 import numpy as np
 from PIL import Image
 from santa.roi_config import ROI
+from santa.template_detector import detector
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 
@@ -35,7 +36,7 @@ TEMPLATES = [
                 '先打開道具或技能面板再擷取。\n'
                 '建議擷取面板邊框或標題列的一小塊。',
         'hint_x': ROI.Panel.x, 'hint_y': ROI.Panel.y1, 
-        'hint_w': 20, 'hint_h': ROI.Panel.y2 - ROI.Panel.y1,
+        'hint_w': ROI.Panel.w, 'hint_h': ROI.Panel.y2 - ROI.Panel.y1,
         'color': (255, 165, 0),
     },
     {
@@ -45,7 +46,7 @@ TEMPLATES = [
                 '通常在畫面右下方，戰鬥時會出現紅色劍/攻擊圖示。\n'
                 '確保角色正在戰鬥中再擷取。',
         'hint_x': ROI.Attack.x1, 'hint_y': ROI.Attack.y, 
-        'hint_w': ROI.Attack.x2 - ROI.Attack.x1, 'hint_h': 5,
+        'hint_w': ROI.Attack.x2 - ROI.Attack.x1, 'hint_h': ROI.Attack.h,
         'color': (0, 0, 255),
     },
     {
@@ -83,6 +84,14 @@ def _load_template_thumb(name):
     return thumb, (orig_w, orig_h)
 
 
+def _save_template_region(name, src_img, x, y, w, h):
+    """記錄模板在截圖中的位置（百分比）並讓偵測器重新載入此模板"""
+    img_h, img_w = src_img.shape[:2]
+    detector.save_search_region(name, x * 100 / img_w, y * 100 / img_h,
+                                w * 100 / img_w, h * 100 / img_h)
+    detector.invalidate_template(name)
+
+
 def _build_review_image(selected_idx=0):
     """建立模板預覽總覽圖"""
     cols = 2
@@ -204,16 +213,13 @@ def _capture_live_screenshot(live_wName):
         return None
     
     print(f'  📸 正在從 [{live_wName}] 截取畫面...')
-    pil_img = getWindow_Img(hwnd)
-    if pil_img is None:
+    frame = getWindow_Img(hwnd)
+    if frame is None:
         print('  ⚠️  截圖失敗')
         return None
     
-    # PIL → cv2
-    rgb = np.array(pil_img)
-    if rgb.shape[2] == 4:
-        rgb = rgb[:, :, :3]
-    cv2_img = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    # BGRA → cv2 的 BGR
+    cv2_img = cv2.cvtColor(frame.array, cv2.COLOR_BGRA2BGR)
     
     # 保存完整截圖
     os.makedirs(TEMPLATE_DIR, exist_ok=True)
@@ -262,6 +268,8 @@ def review_templates(source_img=None, live_wName=None):
             path = os.path.join(TEMPLATE_DIR, f'{tmpl["name"]}.png')
             if os.path.exists(path):
                 os.remove(path)
+                detector.remove_search_region(tmpl['name'])
+                detector.invalidate_template(tmpl['name'])
                 print(f'  🗑️  已刪除: {tmpl["name"]}')
             else:
                 print(f'  ⚠️  {tmpl["name"]} 不存在，無需刪除')
@@ -294,6 +302,7 @@ def review_templates(source_img=None, live_wName=None):
                 template = current_src[y:y+h, x:x+w]
                 save_path = os.path.join(TEMPLATE_DIR, f'{tmpl["name"]}.png')
                 cv2.imwrite(save_path, template)
+                _save_template_region(tmpl['name'], current_src, x, y, w, h)
                 print(f'  ✅ 已重新儲存: {save_path} ({w}x{h})')
             else:
                 print(f'  ⏭️  已取消')
@@ -407,6 +416,7 @@ def capture_from_image(img_path):
             template = img[y:y+h, x:x+w]
             save_path = os.path.join(TEMPLATE_DIR, f'{name}.png')
             cv2.imwrite(save_path, template)
+            _save_template_region(name, img, x, y, w, h)
             print(f'  ✅ 已儲存: {save_path} ({w}x{h})')
         else:
             print(f'  ⏭️  已跳過')
@@ -434,7 +444,7 @@ def capture_from_live(wName):
         return
     
     tmp_path = os.path.join(TEMPLATE_DIR, '_temp_capture.png')
-    img.save(tmp_path, 'PNG')
+    img.pil.save(tmp_path, 'PNG')
     print(f'截圖完成 ({img.width}x{img.height})')
     
     capture_from_image(tmp_path)
@@ -12,6 +12,10 @@ _DEFAULTS = {
     'nox_adb': 'nox_adb.exe',
     'base_width': '1280',
     'base_height': '720',
+    'input_backend': 'adbshell',
+    'monkey_port': '1080',
+    'adb_server_port': '5037',
+    'capture_backend': 'win32',
 }
 
 class EmulatorConfig:
@@ -23,6 +27,10 @@ class EmulatorConfig:
         self.nox_adb = _DEFAULTS['nox_adb']
         self.base_width = int(_DEFAULTS['base_width'])
         self.base_height = int(_DEFAULTS['base_height'])
+        self.input_backend = _DEFAULTS['input_backend']
+        self.monkey_port = int(_DEFAULTS['monkey_port'])
+        self.adb_server_port = int(_DEFAULTS['adb_server_port'])
+        self.capture_backend = _DEFAULTS['capture_backend']
     
     def load_from_ini(self, ini_path='Main.ini'):
         """從 ini 檔讀取 [Emulator] 區段，缺少的 key 使用預設值"""
@@ -36,6 +44,10 @@ class EmulatorConfig:
             self.nox_adb = section.get('NoxAdb', self.nox_adb)
             self.base_width = int(section.get('BaseWidth', str(self.base_width)))
             self.base_height = int(section.get('BaseHeight', str(self.base_height)))
+            self.input_backend = section.get('InputBackend', self.input_backend).lower()
+            self.monkey_port = int(section.get('MonkeyPort', str(self.monkey_port)))
+            self.adb_server_port = int(section.get('AdbServerPort', str(self.adb_server_port)))
+            self.capture_backend = section.get('CaptureBackend', self.capture_backend).lower()
     
     @property
     def nox_console_path(self):
@@ -56,6 +68,23 @@ class EmulatorConfig:
             f'-command:"shell input tap {x} {y}"'
         )
     
+    def build_adb_serial_cmd(self, wName):
+        """產生查詢模擬器 ADB serial 的指令"""
+        drive = os.path.splitdrive(self.nox_path)[0]
+        return (
+            f'{drive} & cd "{self.nox_path}" & '
+            f'.\\{self.nox_console} adb -name:{wName} '
+            f'-command:"get-serialno"'
+        )
+
+    def build_adb_argv(self, serial, *args):
+        """產生對指定裝置執行 adb 的 argv（不經過 cmd）"""
+        return [self.nox_adb_path, '-s', serial, *args]
+
+    def build_adb_shell_argv(self, serial):
+        """產生常駐 adb shell 的 argv（不經過 cmd）"""
+        return self.build_adb_argv(serial, 'shell')
+
     def build_adb_connect_cmd(self, ipAddr):
         """產生 ADB reconnect 指令"""
         drive = os.path.splitdrive(self.nox_path)[0]
@@ -73,8 +102,49 @@ class EmulatorConfig:
                 'NoxAdb': self.nox_adb,
                 'BaseWidth': str(self.base_width),
                 'BaseHeight': str(self.base_height),
+                'InputBackend': self.input_backend,
+                'MonkeyPort': str(self.monkey_port),
+                'AdbServerPort': str(self.adb_server_port),
+                'CaptureBackend': self.capture_backend,
+            }
+
+
+
+# [Runtime] 預設值
+_RUNTIME_DEFAULTS = {
+    'execution_mode': 'thread',
+    'pool_workers': '4',
+}
+
+
+class RuntimeConfig:
+    """執行模式設定，從 Main.ini [Runtime] 區段讀取"""
+    
+    def __init__(self):
+        # thread = 每個玩家一條 thread；pool = 所有玩家共用 pool_workers 條 thread；
+        # process = 每個玩家一個 worker process
+        self.execution_mode = _RUNTIME_DEFAULTS['execution_mode']
+        self.pool_workers = int(_RUNTIME_DEFAULTS['pool_workers'])
+    
+    def load_from_ini(self, ini_path='Main.ini'):
+        """從 ini 檔讀取 [Runtime] 區段，缺少的 key 使用預設值"""
+        config = ConfigParser()
+        config.read(ini_path)
+        
+        if 'Runtime' in config:
+            section = config['Runtime']
+            self.execution_mode = section.get('ExecutionMode', self.execution_mode).lower()
+            self.pool_workers = int(section.get('PoolWorkers', str(self.pool_workers)))
+    
+    def save_defaults_to_ini(self, config):
+        """若 ini 檔沒有 [Runtime] 區段，寫入預設值"""
+        if 'Runtime' not in config:
+            config['Runtime'] = {
+                'ExecutionMode': self.execution_mode,
+                'PoolWorkers': str(self.pool_workers),
             }
 
 
 # 全域單例
 emulator_config = EmulatorConfig()
+runtime_config = RuntimeConfig()
@@ -0,0 +1,251 @@
+"""
+離線測試用的假裝置 — 不開模擬器也能驗證輸入後端。
+
+    假 adb 執行檔：記錄收到的 argv 與每一行 shell 指令，`echo` 原樣回覆
+    FakeMonkeyServer：本機 TCP server，說 monkey --port 的文字協定（tap / touch / quit ...）
+    FakeAdbServer：本機 TCP server，說 adb host protocol（host:* / transport / shell: / exec-out:）
+
+使用方式:
+    python -m santa.fakes adb --log cmds.txt [--die-after N] -s 127.0.0.1:62001 shell
+
+    backend = AdbShellInput('wsh9', argv=fake_adb_argv('cmds.txt'))
+    backend.tap(100, 200)      # cmds.txt 會多一行 "input tap 100 200"
+
+    with FakeMonkeyServer() as server:
+        backend = MonkeyInput('wsh9', address=server.address)
+        backend.tap(100, 200)  # server.commands == ['wake', 'tap 100 200']
+
+    with FakeAdbServer(serials=['127.0.0.1:62001']) as server:
+        client = AdbClient(port=server.port)
+        client.device('127.0.0.1:62001').tap(100, 200)   # server.shell_lines 會收到 'input tap 100 200'
+"""
+import socket
+import sys
+from threading import Thread
+
+
+def fake_adb_argv(logPath, dieAfter=None, serial='fake:5555'):
+    """組出執行假 adb shell 的 argv，可直接傳給 AdbShellInput(argv=...)"""
+    argv = [sys.executable, '-m', 'santa.fakes', 'adb', '--log', logPath]
+    if dieAfter is not None:
+        argv += ['--die-after', str(dieAfter)]
+    return argv + ['-s', serial, 'shell']
+
+
+def run_fake_adb(args):
+    """假 adb shell：逐行讀 stdin，全部寫進 log；收到 dieAfter 行後直接結束（模擬斷線）"""
+    logPath = None
+    dieAfter = None
+    rest = []
+    it = iter(args)
+    for arg in it:
+        if arg == '--log':
+            logPath = next(it)
+        elif arg == '--die-after':
+            dieAfter = int(next(it))
+        else:
+            rest.append(arg)
+
+    with open(logPath, 'a', encoding='utf-8') as log:
+        log.write('$ adb %s\n' % ' '.join(rest))
+        log.flush()
+        received = 0
+        for line in sys.stdin:
+            line = line.rstrip('\n')
+            log.write(line + '\n')
+            log.flush()
+            if line == 'exit':
+                return 0
+            if line.startswith('echo '):
+                sys.stdout.write(line[5:] + '\n')
+                sys.stdout.flush()
+            received += 1
+            if dieAfter is not None and received >= dieAfter:
+                return 1
+    return 0
+
+
+class FakeMonkeyServer:
+    """假的 monkey 事件 server：記錄收到的指令，合法指令回 OK，其餘回 ERROR"""
+
+    COMMANDS = ('tap', 'touch', 'key', 'press', 'type', 'wake', 'sleep', 'flip', 'trackball')
+
+    def __init__(self, host='127.0.0.1', port=0, hangup=False):
+        """
+        Args:
+            hangup: 接受連線後立刻關閉（模擬 adb forward 在裝置端 monkey 沒有 listen 時的行為）
+        """
+        self.commands = []
+        self.accepts = 0
+        self.hangup = hangup
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+        self._clients = []
+        self._thread = Thread(target=self._accept_loop, name='fake-monkey', daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.accepts += 1
+            if self.hangup:
+                conn.close()
+                continue
+            self._clients.append(conn)
+            Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn, conn.makefile('rb') as reader:
+            try:
+                for raw in reader:
+                    line = raw.decode('ascii', 'replace').strip()
+                    if line in ('quit', 'done'):
+                        return
+                    self.commands.append(line)
+                    ok = line.split(' ', 1)[0] in self.COMMANDS
+                    conn.sendall(b'OK\n' if ok else b'ERROR\n')
+            except OSError:
+                return  # client 斷線或被 drop_clients 切斷
+
+    def drop_clients(self):
+        """強制切斷目前所有連線（模擬裝置端 monkey 被砍掉）"""
+        for conn in self._clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._clients.clear()
+
+    def close(self):
+        self._server.close()
+        self.drop_clients()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeAdbServer:
+    """
+    假的 adb server：依 wire format 回 OKAY / FAIL，記錄收到的 request。
+
+    Args:
+        serials: 已連線的裝置 serial
+        outputs: {指令: bytes}，shell:/exec-out: 一次性指令的回覆內容（預設空）
+    """
+
+    VERSION = 41
+
+    def __init__(self, serials=('fake:5555',), outputs=None, host='127.0.0.1'):
+        self.serials = list(serials)
+        self.outputs = dict(outputs or {})
+        self.requests = []      # 所有 request 字串（含 host:transport:...）
+        self.shell_lines = []   # 常駐 shell 串流收到的每一行
+        self._server = socket.create_server((host, 0))
+        self.address = self._server.getsockname()[:2]
+        self.port = self.address[1]
+        self._thread = Thread(target=self._accept_loop, name='fake-adb', daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _read_request(conn):
+        header = b''
+        while len(header) < 4:
+            chunk = conn.recv(4 - len(header))
+            if not chunk:
+                return None
+            header += chunk
+        size = int(header, 16)
+        data = b''
+        while len(data) < size:
+            data += conn.recv(size - len(data))
+        return data.decode('utf-8')
+
+    @staticmethod
+    def _okay(conn, payload=None):
+        conn.sendall(b'OKAY')
+        if payload is not None:
+            data = payload.encode('utf-8')
+            conn.sendall(b'%04x' % len(data) + data)
+
+    @staticmethod
+    def _fail(conn, message):
+        data = message.encode('utf-8')
+        conn.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+    def _serve(self, conn):
+        with conn:
+            serial = None
+            while True:
+                request = self._read_request(conn)
+                if request is None:
+                    return
+                self.requests.append(request)
+
+                if request == 'host:version':
+                    return self._okay(conn, '%04x' % self.VERSION)
+                if request == 'host:devices':
+                    return self._okay(conn, ''.join(f'{s}\tdevice\n' for s in self.serials))
+                if request.startswith('host:connect:'):
+                    address = request[len('host:connect:'):]
+                    if address not in self.serials:
+                        self.serials.append(address)
+                    return self._okay(conn, f'connected to {address}')
+                if request.startswith('host:transport:'):
+                    serial = request[len('host:transport:'):]
+                    if serial not in self.serials:
+                        return self._fail(conn, f"device '{serial}' not found")
+                    self._okay(conn)
+                    continue  # 同一條連線接著送裝置服務
+                if serial is None:
+                    return self._fail(conn, f'unknown host service: {request}')
+
+                service, _, command = request.partition(':')
+                if service not in ('shell', 'exec-out'):
+                    return self._fail(conn, f'unknown service: {service}')
+                self._okay(conn)
+                if command in ('', 'sh'):
+                    return self._serve_shell(conn)
+                conn.sendall(self.outputs.get(command, b''))
+                return
+
+    def _serve_shell(self, conn):
+        for raw in conn.makefile('rb'):
+            line = raw.decode('utf-8', 'replace').rstrip('\n')
+            if line == 'exit':
+                return
+            self.shell_lines.append(line)
+
+    def disconnect(self, serial):
+        """模擬裝置斷線（之後 transport 會回 FAIL，直到 host:connect）"""
+        if serial in self.serials:
+            self.serials.remove(serial)
+
+    def close(self):
+        self._server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'adb':
+        print('使用方式: python -m santa.fakes adb --log <file> [--die-after N] [adb 參數...]')
+        sys.exit(1)
+    sys.exit(run_fake_adb(sys.argv[2:]))
@@ -0,0 +1,144 @@
+"""
+單一 tick 的截圖包裝 — 各種格式只轉換一次並記住結果，讓同一個 tick 的
+像素偵測、模板比對、預覽共用，不再各自 np.array / cvtColor 一次整張圖。
+
+使用方式:
+    frame = Frame.wrap(img)        # PIL Image、ndarray 或 Frame
+    frame.rgb                      # RGB ndarray（可能是 view）
+    frame.gray                     # 灰階 ndarray（第一次用到才轉）
+    frame.gray_scaled(2)           # 縮小 1/2 的灰階（金字塔比對用，同樣只算一次）
+    frame.pil                      # PIL Image（預覽/存檔用）
+"""
+import cv2
+import numpy as np
+from PIL import Image
+
+# 各色彩排列轉灰階的 cv2 code
+_GRAY_CODES = {
+    'RGB': cv2.COLOR_RGB2GRAY,
+    'RGBA': cv2.COLOR_RGBA2GRAY,
+    'BGR': cv2.COLOR_BGR2GRAY,
+    'BGRA': cv2.COLOR_BGRA2GRAY,
+}
+
+
+class Frame:
+    """截圖包裝：延遲轉換並快取 ndarray / 灰階 / PIL 版本（唯讀使用）"""
+
+    __slots__ = ('order', '_pil', '_array', '_rgb', '_gray', '_gray_scaled')
+
+    def __init__(self, img, order='RGB'):
+        """
+        Args:
+            img: PIL Image 或 ndarray (H, W, 3|4) / (H, W)
+            order: ndarray 的色彩排列 'RGB' / 'RGBA' / 'BGR' / 'BGRA'（PIL 依 mode 自動判斷）
+        """
+        self._pil = None
+        self._array = None
+        self._rgb = None
+        self._gray = None
+        self._gray_scaled = {}
+        if isinstance(img, Image.Image):
+            self._pil = img
+            self.order = img.mode if img.mode in _GRAY_CODES else 'L'
+        else:
+            self._array = img
+            self.order = order if img.ndim == 3 else 'L'
+
+    @classmethod
+    def wrap(cls, img):
+        """已是 Frame 就原樣回傳，否則包一層"""
+        return img if isinstance(img, Frame) else cls(img)
+
+    @property
+    def array(self):
+        """原始 ndarray（依 self.order 排列）"""
+        if self._array is None:
+            self._array = np.asarray(self._pil)
+        return self._array
+
+    @property
+    def rgb(self):
+        """RGB 排列的 ndarray；BGR(A) 來源回傳反轉通道的 view，不複製"""
+        if self._rgb is None:
+            arr = self.array
+            if self.order in ('RGB', 'L'):
+                self._rgb = arr
+            elif self.order == 'RGBA':
+                self._rgb = arr[..., :3]
+            else:
+                self._rgb = arr[..., 2::-1]
+        return self._rgb
+
+    @property
+    def gray(self):
+        """灰階 ndarray，整個 tick 只轉一次"""
+        if self._gray is None:
+            arr = self.array
+            self._gray = arr if self.order == 'L' else cv2.cvtColor(arr, _GRAY_CODES[self.order])
+        return self._gray
+
+    def gray_scaled(self, scale):
+        """縮小 scale 倍的灰階 ndarray（INTER_AREA），每個倍率只算一次"""
+        if scale == 1:
+            return self.gray
+        small = self._gray_scaled.get(scale)
+        if small is None:
+            small = downscale(self.gray, scale)
+            self._gray_scaled[scale] = small
+        return small
+
+    @property
+    def pil(self):
+        """PIL Image（RGB）；原本就是 PIL 則直接回傳"""
+        if self._pil is None:
+            self._pil = Image.fromarray(np.ascontiguousarray(self.rgb))
+        return self._pil
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    @property
+    def size(self):
+        """(width, height)，與 PIL 相同"""
+        if self._pil is not None:
+            return self._pil.size
+        return self._array.shape[1], self._array.shape[0]
+
+
+def crop_window_image(bgra, maxWidth=1000):
+    """
+    模擬器視窗截圖（BitBlt 的 BGRA ndarray）→ 遊戲畫面：
+    切掉上方標題列（最大化時再切掉左右黑邊與工具列），寬度超過 maxWidth 才縮小。
+
+    裁切只是 view；需要縮小時做一次 cv2.resize(INTER_AREA)。保留 BGRA 四通道——
+    丟掉 alpha 交給 Frame(order='BGRA').rgb 的 view，灰階則直接用 BGRA2GRAY，
+    不必先產生步距不連續的 3 通道 view（cvtColor 會在內部再複製一次）。
+    """
+    height, width = bgra.shape[:2]
+    if (height - 26) / width < 0.55:  # 表示視窗放到最大
+        noxToolsWidth = 30
+        leftBound = (width - int((height - 26) / 0.5615) - noxToolsWidth) / 2
+        rightBound = leftBound + noxToolsWidth
+        left, right = round(leftBound), round(width - rightBound)
+    else:
+        left, right = 0, width
+    view = bgra[27:height, left:right]
+
+    h, w = view.shape[:2]
+    if w > maxWidth:
+        size = (maxWidth, int(h * (maxWidth / w)))
+        return cv2.resize(view, size, interpolation=cv2.INTER_AREA)
+    return view
+
+
+def downscale(img, scale):
+    """把 ndarray 長寬各縮小 scale 倍（INTER_AREA，至少 1px）"""
+    h, w = img.shape[:2]
+    size = (max(1, w // scale), max(1, h // scale))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
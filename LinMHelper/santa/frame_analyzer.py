@@ -0,0 +1,178 @@
+"""
+單次掃描畫面分析器 — 一個 tick 只做一次 ndarray 轉換、一次灰階轉換（由 Frame 記住）、一次像素座標換算，
+所有偵測（模板或像素）共用同一份資料，並回傳型別化的 FrameState。
+像素座標來自 roi_geometry 的解析度快取，視窗尺寸不變時不會重新換算。
+分析過程不會修改截圖，取樣點標示另外用 overlay() 畫在副本上。
+
+每個偵測項目會記住「讀取區域的指紋 → 結果」：區域像素與上一次完全相同時直接沿用結果，
+不重跑偵測（像素偵測只雜湊那幾條 ROI；模板偵測雜湊搜尋範圍，全畫面搜尋時雜湊整張灰階）。
+黑畫面（瞬移、讀取、換地圖）在最前面用抽樣亮度判斷，直接回傳 isDark，其餘偵測全部略過。
+
+使用方式:
+    analyzer = FrameAnalyzer(teamPosition)
+    state = analyzer.analyze(img)
+    state.hp, state.mp, state.isAttacked ...
+    preview = analyzer.overlay(img)   # 只有需要預覽時才呼叫
+    analyzer.saved, analyzer.evaluated  # 這次沿用 / 實際執行的偵測數
+"""
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Callable, Optional
+
+import numpy as np
+
+from santa.frame import Frame
+from santa.ImageUtils import TEMPLATE_THRESHOLDS, frameToArray, \
+    teamEnabledByPixel, teamPositionAvalibleByPixel, panelOpenedByPixel, \
+    hpPercentByPixel, mpPercentByPixel, isAttackByPixel, isAttackedByPixel, \
+    isDarkByPixel, drawProbeOverlay
+from santa.roi_geometry import CompiledROI, compile_roi
+from santa.template_detector import detector
+
+
+@dataclass
+class FrameState:
+    """單張畫面的偵測結果"""
+    hp: int = -1
+    mp: int = -1
+    isPosion: bool = False
+    isTeamEnabled: bool = False
+    isGrey: int = 0
+    isRightPanelOpened: bool = False
+    isAttack: bool = False
+    isAttacked: bool = False
+    isDark: bool = False  # 黑畫面/讀取中，其餘欄位都是預設值
+
+
+def _fingerprint(arr, regions) -> bytes:
+    """把幾塊 ROI 的像素雜湊成 8 bytes 指紋（每塊都很小，複製成連續記憶體的成本可忽略）"""
+    h = blake2b(digest_size=8)
+    for region in regions:
+        h.update(np.ascontiguousarray(arr[region]))
+    return h.digest()
+
+
+class FrameAnalyzer:
+    """把整組偵測合併成一次呼叫，共用 ndarray / 灰階 / 像素 ROI"""
+    
+    def __init__(self, teamPosition: int = 0):
+        self.teamPosition = teamPosition
+        self._geo: Optional[CompiledROI] = None
+        # 偵測結果快取 {name: (指紋, 結果)}；解析度或模板有變動時整個清掉
+        self._results = {}
+        self._resultsKey = None
+        # 統計：最近一次 analyze 與累計的沿用 / 實際執行次數
+        self.saved = 0
+        self.evaluated = 0
+        self.totalSaved = 0
+        self.totalEvaluated = 0
+    
+    def geometry(self, arr) -> CompiledROI:
+        """取得目前解析度的已編譯 ROI，只有截圖尺寸改變時才換"""
+        height, width = arr.shape[:2]
+        if self._geo is None or self._geo.size != (width, height):
+            self._geo = compile_roi(width, height)
+        return self._geo
+    
+    def analyze(self, img) -> FrameState:
+        """img 可為 Frame / PIL Image / RGB ndarray；灰階由 Frame 延遲轉換並記住"""
+        frame = Frame.wrap(img)
+        arr = frame.rgb
+        self.saved = self.evaluated = 0
+        if isDarkByPixel(arr):
+            return FrameState(isDark=True)
+        
+        geo = self.geometry(arr)
+        if self._resultsKey != (geo, detector.generation):
+            self._results.clear()
+            self._resultsKey = (geo, detector.generation)
+        templates = {name for name in TEMPLATE_THRESHOLDS if detector.has_template(name)}
+        state = FrameState()
+        
+        def detect(name: str, regions, pixelFn: Callable[[], bool]) -> bool:
+            if name in templates:
+                return self._match_template(frame, name)
+            return self._gated(name, _fingerprint(arr, regions), pixelFn)
+        
+        state.isTeamEnabled = detect('team_enabled', (geo.team_cp1, geo.team_cp2),
+                                     lambda: teamEnabledByPixel(arr, geo))
+        state.isRightPanelOpened = detect('panel_opened', (geo.panel,),
+                                          lambda: panelOpenedByPixel(arr, geo))
+        state.isAttacked = detect('is_attacked', (geo.attacked_area1, geo.attacked_area2),
+                                  lambda: isAttackedByPixel(arr, geo))
+        
+        if state.isTeamEnabled and not state.isRightPanelOpened:
+            slots = [geo.team_slot(position) for position in (self.teamPosition, 0)]
+            regions = [region for slot in slots for region in slot]
+            state.hp, state.isPosion, state.mp = self._gated(
+                'hud', _fingerprint(arr, regions), lambda: self._read_hud(arr, geo))
+            
+            state.isAttack = detect('is_attack', (geo.attack,), lambda: isAttackByPixel(arr, geo))
+        
+        self.totalSaved += self.saved
+        self.totalEvaluated += self.evaluated
+        return state
+    
+    def _gated(self, name, fingerprint, evaluate):
+        """指紋與上次相同就沿用結果，否則執行 evaluate() 並記住"""
+        cached = self._results.get(name)
+        if cached is not None and cached[0] == fingerprint:
+            self.saved += 1
+            return cached[1]
+        result = evaluate()
+        self._results[name] = (fingerprint, result)
+        self.evaluated += 1
+        return result
+    
+    def _match_template(self, frame, name) -> bool:
+        """
+        模板偵測的快取：上次在局部範圍內找到 → 只要局部範圍不變結果就相同；
+        上次走全畫面搜尋（沒找到或找到範圍外）→ 整張灰階不變才沿用。
+        """
+        gray = frame.gray
+        height, width = gray.shape[:2]
+        window = detector.search_window(name, width, height)
+        local = (slice(window[1], window[3]), slice(window[0], window[2])) if window else None
+        
+        cached = self._results.get(name)
+        if cached is not None:
+            (scope, fingerprint), matched = cached
+            region = local if scope == 'window' else Ellipsis
+            if region is not None and fingerprint == _fingerprint(gray, (region,)):
+                self.saved += 1
+                return matched
+        
+        matched, conf, loc = detector.match_template(frame, name, threshold=TEMPLATE_THRESHOLDS[name])
+        self.evaluated += 1
+        if matched and window is not None and _inside(loc, window):
+            scope, region = 'window', local
+        else:
+            scope, region = 'full', Ellipsis
+        self._results[name] = ((scope, _fingerprint(gray, (region,))), matched)
+        return matched
+    
+    def _read_hud(self, arr, geo):
+        """隊伍位置 + HP / 毒 / MP，回傳 (hp, isPosion, mp)"""
+        position = self._find_team_position(arr, geo)
+        if position is None:
+            return -1, False, -1
+        hp, isPosion = hpPercentByPixel(arr, geo, position)
+        return hp, isPosion, mpPercentByPixel(arr, geo, position)
+    
+    def overlay(self, img):
+        """回傳標好所有取樣 ROI 的截圖副本（debug 預覽用，原圖不變）"""
+        return drawProbeOverlay(img, self.geometry(frameToArray(img)), self.teamPosition)
+    
+    def _find_team_position(self, arr, geo) -> Optional[int]:
+        """先找設定的隊伍位置，找不到再退回第一格"""
+        for position in (self.teamPosition, 0):
+            if teamPositionAvalibleByPixel(arr, geo, position):
+                return position
+        return None
+
+
+def _inside(loc, window) -> bool:
+    """比對到的位置 (x, y, w, h) 是否整塊落在搜尋範圍 (x0, y0, x1, y1) 內"""
+    x, y, w, h = loc
+    x0, y0, x1, y1 = window
+    return x >= x0 and y >= y0 and x + w <= x1 and y + h <= y1
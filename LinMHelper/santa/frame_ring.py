@@ -0,0 +1,162 @@
+"""
+共享記憶體的環狀 frame buffer — 每個玩家固定幾格 slot，producer 直接把畫面寫進 slot，
+consumer（偵測、GUI 預覽、錄影）在任何 process 都能以 NumPy view 讀取，不經過 pickle / queue 複製。
+
+記憶體配置（multiprocessing.shared_memory）:
+    row 0           : [latestSeq, slots, slotBytes, MAGIC, 0]
+    row 1..slots    : 每格 slot 的 [seq, h, w, c, order]，seq = -1 表示空的或寫入中
+    data            : slots × slotBytes
+
+    producer 單一寫入者：reserve() 取得下一格的 view → 直接寫入 → commit() 公開 seq
+    consumer 拿 seq 取 view；用完後 valid(seq) 為 False 表示該格已被覆寫，結果要丟掉
+
+使用方式:
+    ring = FrameRing.create(slots=3)              # 擁有者（GUI process）
+    ring.name                                     # 傳給 worker process
+    ring = FrameRing.attach(name)                 # worker / 其他 consumer
+
+    dst = ring.reserve((562, 1000, 4))            # producer：寫進 dst（例如 cv2.resize(dst=...)）
+    seq = ring.commit('BGRA')
+    seq = ring.publish(arr, 'RGB')                # 已有 ndarray 時：複製一次進 slot
+
+    frame = ring.frame(ring.latest())             # Frame 包裝的 view，不複製
+    ring.close(); ring.unlink()                   # unlink 只由擁有者呼叫
+"""
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from santa.frame import Frame
+
+MAGIC = 0x4C4D4652  # 'LMFR'
+ORDERS = ('L', 'RGB', 'BGR', 'RGBA', 'BGRA')
+_FIELDS = 5
+_ALIGN = 64
+
+# 預設 slot 大小：寬 1000 的 BGRA 畫面，高度留到 640（16:9 視窗縮小後約 562）
+DEFAULT_SLOT_BYTES = 1000 * 640 * 4
+
+
+def _data_offset(slots):
+    header = (slots + 1) * _FIELDS * 8
+    return (header + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class FrameRing:
+    """單一 producer 的共享記憶體 frame ring"""
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        meta = np.ndarray((_FIELDS,), np.int64, buffer=shm.buf)
+        if meta[3] != MAGIC:
+            raise ValueError('不是 FrameRing 共享記憶體: %s' % shm.name)
+        self.slots = int(meta[1])
+        self.slotBytes = int(meta[2])
+        self._header = np.ndarray((self.slots + 1, _FIELDS), np.int64, buffer=shm.buf)
+        self._offset = _data_offset(self.slots)
+        self._pending = None  # reserve 後尚未 commit 的 (seq, shape)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @classmethod
+    def create(cls, slots=3, slotBytes=DEFAULT_SLOT_BYTES, name=None):
+        size = _data_offset(slots) + slots * slotBytes
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((slots + 1, _FIELDS), np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[1:, 0] = -1
+        header[0] = (-1, slots, slotBytes, MAGIC, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        連上既有的 ring。
+        3.13 以前 attach 也會登記到 resource_tracker；spawn 出來的 worker 與擁有者共用同一個
+        tracker，所以只應由擁有者的子 process attach（擁有者 unlink 時一併取消登記）。
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    # ====== producer ======
+
+    def fits(self, shape) -> bool:
+        return int(np.prod(shape)) <= self.slotBytes
+
+    def _slot_view(self, slot, shape):
+        start = self._offset + slot * self.slotBytes
+        return np.ndarray(shape, np.uint8, buffer=self._shm.buf, offset=start)
+
+    def reserve(self, shape):
+        """取得下一格 slot 的可寫 view（形狀為 shape，uint8）；commit() 之前 consumer 看不到"""
+        if not self.fits(shape):
+            raise ValueError('frame %r 超過 slot 大小 %d bytes' % (tuple(shape), self.slotBytes))
+        seq = int(self._header[0, 0]) + 1
+        slot = seq % self.slots
+        self._header[1 + slot, 0] = -1  # 寫入中，舊的 seq 立即失效
+        self._pending = (seq, tuple(shape))
+        return self._slot_view(slot, shape)
+
+    def commit(self, order='BGRA') -> int:
+        """公開最近一次 reserve 的 slot，回傳它的 seq"""
+        seq, shape = self._pending
+        self._pending = None
+        h, w = shape[:2]
+        c = shape[2] if len(shape) == 3 else 1
+        row = self._header[1 + seq % self.slots]
+        row[1:] = (h, w, c, ORDERS.index(order))
+        row[0] = seq
+        self._header[0, 0] = seq
+        return seq
+
+    def publish(self, arr, order='BGRA') -> int:
+        """把已有的 ndarray 複製進下一格 slot 並公開"""
+        np.copyto(self.reserve(arr.shape), arr)
+        return self.commit(order)
+
+    # ====== consumer ======
+
+    def latest(self) -> int:
+        """最新已公開的 seq；還沒有任何畫面時為 -1"""
+        return int(self._header[0, 0])
+
+    def valid(self, seq) -> bool:
+        """seq 的 slot 還沒被覆寫（讀完 view 後檢查一次）"""
+        return seq >= 0 and int(self._header[1 + seq % self.slots, 0]) == seq
+
+    def view(self, seq):
+        """seq 對應的唯讀 ndarray view；已被覆寫時回傳 None"""
+        if not self.valid(seq):
+            return None
+        _, h, w, c, _ = (int(v) for v in self._header[1 + seq % self.slots])
+        arr = self._slot_view(seq % self.slots, (h, w, c) if c > 1 else (h, w))
+        arr.flags.writeable = False
+        return arr
+
+    def frame(self, seq):
+        """seq 對應的 Frame（包裝 view，不複製）；已被覆寫時回傳 None"""
+        arr = self.view(seq)
+        if arr is None:
+            return None
+        return Frame(arr, ORDERS[int(self._header[1 + seq % self.slots, 4])])
+
+    # ====== 生命週期 ======
+
+    def close(self):
+        self._header = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # 還有 consumer 持有 view；process 結束時一併釋放
+
+    def unlink(self):
+        """釋放共享記憶體（只有 create 的擁有者呼叫）"""
+        if self._owner:
+            self._shm.unlink()
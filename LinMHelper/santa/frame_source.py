@@ -0,0 +1,479 @@
+"""
+截圖來源 — PlayerThread 取得畫面的可替換介面。
+
+    Win32FrameSource       : 原本的 win32 視窗截圖（getWindow_Img），只能在 Windows 桌面使用
+    AdbScreencapSource     : 透過 adb `exec-out screencap` 取原始 RGBA（不經 PNG 編碼），
+                             模擬器最小化或無視窗也能截圖
+    ScreenrecordSource     : 常駐 `exec-out screenrecord` H.264 串流，背景持續解碼，
+                             read() 永遠拿到最新一張（沒有每張截圖的請求成本）
+    DirectoryFrameSource   : 重播資料夾內的 PNG（或 SessionRecorder 錄下的 session）
+    VideoFrameSource       : 重播影片檔（cv2.VideoCapture）
+
+Main.ini [Emulator] CaptureBackend = win32 / screencap / screenrecord 決定 PlayerThread 預設的來源，
+見 create_capture_source()。
+
+重播來源都可以設定 fps：None = 原始節奏（session 時間戳 / 影片 fps / 資料夾不限速），
+0 = 不限速（壓測用），其他數值 = 固定每秒張數。
+
+使用方式:
+    source = DirectoryFrameSource('LinMOut/session1', fps=5, loop=True)
+    frame = source.read()     # Frame 或 None
+    source.close()
+"""
+import json
+import os
+import socket
+import struct
+from threading import Condition, Thread
+from time import monotonic, sleep
+
+import cv2
+import numpy as np
+
+from santa.config import emulator_config
+from santa.frame import Frame
+from santa.logger import log
+
+SESSION_FILE = 'session.json'
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.raw')
+
+# screencap 原始格式 → Frame 色彩排列（android PixelFormat）
+SCREENCAP_FORMATS = {1: 'RGBA', 2: 'RGBA', 5: 'BGRA'}
+
+
+class FrameSource:
+    """截圖來源介面：read() 回傳一張畫面（PIL Image / ndarray / Frame），沒有畫面時回傳 None"""
+
+    finished = False  # 重播來源播完（且不循環）時設為 True
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Win32FrameSource(FrameSource):
+    """win32 視窗截圖（原本 PlayerThread 寫死的路徑）"""
+
+    def __init__(self, hwnd):
+        self.hwnd = hwnd
+
+    def read(self):
+        from santa.Lib32 import getWindow_Img
+        return getWindow_Img(self.hwnd)
+
+
+class AdbScreencapSource(FrameSource):
+    """adb exec-out screencap 的原始 framebuffer，直接映射成 ndarray（不複製、不解碼 PNG）"""
+
+    def __init__(self, wName, serial=None, client=None, recorder=None):
+        """
+        Args:
+            wName: 模擬器視窗名稱（用來查 serial）
+            serial: 已知的 adb serial；None 時透過 NoxConsole 查一次
+            client: AdbClient；None 時用全域共用的 client
+            recorder: SessionRecorder，有給就把每張原始 dump 存下來供之後重播
+        """
+        self.wName = wName
+        self.serial = serial
+        self._client = client
+        self.recorder = recorder
+
+    def read(self):
+        from santa.adb_client import AdbError, get_client
+        from santa.input_backends import resolve_serial
+        if self.serial is None:
+            self.serial = resolve_serial(self.wName)
+            if self.serial is None:
+                return None
+        try:
+            raw = (self._client or get_client()).exec_out(self.serial, 'screencap')
+            frame = decode_screencap(raw)
+        except (AdbError, OSError, ValueError) as e:
+            log.warning('screencap 失敗 [%s]: %s', self.wName, e)
+            return None
+        if self.recorder is not None:
+            self.recorder.write_raw(raw)
+        return frame
+
+    def close(self):
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+class ScreenrecordSource(FrameSource):
+    """
+    H.264 串流截圖：byte 串流經本機 TCP relay 餵給 cv2.VideoCapture（FFmpeg），
+    背景 thread 持續解碼並只保留最新一張。screenrecord 有時間上限，串流結束會自動重開。
+    """
+
+    COMMAND = 'screenrecord --output-format=h264 -'
+    FIRST_FRAME_TIMEOUT = 10
+    RESTART_BACKOFF = 1
+
+    def __init__(self, wName, serial=None, client=None, open_stream=None, restart=True):
+        """
+        Args:
+            wName: 模擬器視窗名稱（用來查 serial）
+            serial: 已知的 adb serial；None 時透過 NoxConsole 查一次
+            client: AdbClient；None 時用全域共用的 client
+            open_stream: fn() -> 可 recv/read 的 binary 串流；None 時開 adb screenrecord
+                         （測試時可給 lambda: open('clip.h264', 'rb')）
+            restart: 串流結束後是否重開（檔案測試時設 False，播完即 finished）
+        """
+        self.wName = wName
+        self.serial = serial
+        self._client = client
+        self._open_stream = open_stream or self._open_adb_stream
+        self.restart = restart
+        self.finished = False
+        self.decoded = 0        # 解碼總張數
+        self.delivered = 0      # read() 拿走的張數（其餘是被更新的畫面蓋掉）
+        self._latest = None
+        self._seq = 0
+        self._readSeq = 0
+        self._ended = False
+        self._stopped = False
+        self._cond = Condition()
+        self._thread = None
+        self._stream = None     # 目前的 adb 串流與 relay server，close() 時強制關閉讓阻塞的 read 返回
+        self._server = None
+
+    def _open_adb_stream(self):
+        from santa.adb_client import get_client
+        from santa.input_backends import resolve_serial
+        if self.serial is None:
+            self.serial = resolve_serial(self.wName)
+            if self.serial is None:
+                raise OSError('找不到 adb serial: %s' % self.wName)
+        sock = (self._client or get_client()).open_service(self.serial, 'exec-out:' + self.COMMAND)
+        sock.settimeout(None)
+        return sock
+
+    def _relay(self, server, stream):
+        """把串流原樣轉寫給連進來的 FFmpeg"""
+        read = getattr(stream, 'recv', None) or getattr(stream, 'read1', None) or stream.read
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            try:
+                while not self._stopped:
+                    chunk = read(65536)
+                    if not chunk:
+                        break
+                    conn.sendall(chunk)
+            except OSError:
+                pass
+        stream.close()
+
+    def _decode_once(self):
+        """開一次串流並解碼到結束"""
+        stream = self._stream = self._open_stream()
+        server = self._server = socket.create_server(('127.0.0.1', 0))
+        server.settimeout(self.FIRST_FRAME_TIMEOUT)
+        if self._stopped:
+            self._shutdown()
+        relay = Thread(target=self._relay, args=(server, stream), name=f'{self.wName}-relay', daemon=True)
+        relay.start()
+        cap = cv2.VideoCapture('tcp://127.0.0.1:%d' % server.getsockname()[1], cv2.CAP_FFMPEG)
+        try:
+            while not self._stopped:
+                ok, bgr = cap.read()
+                if not ok:
+                    break
+                with self._cond:
+                    self._latest = Frame(bgr, 'BGR')
+                    self._seq += 1
+                    self.decoded += 1
+                    self._cond.notify_all()
+        finally:
+            cap.release()
+            server.close()
+            stream.close()
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                self._decode_once()
+            except OSError as e:
+                log.warning('screenrecord 串流錯誤 [%s]: %s', self.wName, e)
+            if self._stopped or not self.restart:
+                break
+            log.info('screenrecord 串流結束，重新開啟 [%s]', self.wName)
+            sleep(self.RESTART_BACKOFF)
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def read(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name=f'{self.wName}-screenrecord', daemon=True)
+            self._thread.start()
+        with self._cond:
+            # 不等第一張解碼：還沒有畫面時直接回傳 None，由 tick 排程稍後再讀（不佔住 pool 的 worker）
+            if self._ended and self._seq == self._readSeq:
+                # 串流已結束且沒有新畫面（不重開時才會發生）
+                self.finished = True
+                return None
+            if self._seq != self._readSeq:
+                self.delivered += 1
+                self._readSeq = self._seq
+            return self._latest
+
+    def _shutdown(self):
+        """關閉串流與 relay server：relay 卡在 read、FFmpeg 卡在 cap.read() 都會立即結束"""
+        for sock in (self._stream, self._server):
+            if sock is None:
+                continue
+            shutdown = getattr(sock, 'shutdown', None)
+            if shutdown is not None:
+                try:
+                    shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def close(self):
+        self._stopped = True
+        self._shutdown()
+        if self._thread is not None:
+            self._thread.join(2)
+
+
+class _ReplaySource(FrameSource):
+    """重播來源共用的節奏控制（monotonic clock）"""
+
+    def __init__(self, fps=None, loop=False):
+        self.fps = fps
+        self.loop = loop
+        self.finished = False
+        self._start = None
+        self._loop_offset = 0.0
+
+    def _wait_until(self, offset):
+        """等到「開始播放後 offset 秒」；offset 為 None 代表不等"""
+        now = monotonic()
+        if self._start is None:
+            self._start = now
+        if offset is None:
+            return
+        delay = self._start + self._loop_offset + offset - now
+        if delay > 0:
+            sleep(delay)
+
+    def _fixed_offset(self, index):
+        """固定 fps 時第 index 張的播放時間；fps 為 0 不限速"""
+        return index / self.fps if self.fps else None
+
+    def _rewind(self, duration):
+        """循環播放：下一輪的時間軸往後推 duration 秒"""
+        if self._start is not None:
+            self._loop_offset += duration
+
+
+class DirectoryFrameSource(_ReplaySource):
+    """重播資料夾內的圖片；若有 session.json 則依錄製時的順序與時間戳播放"""
+
+    def __init__(self, path, fps=None, loop=False, speed=1.0):
+        super().__init__(fps, loop)
+        self.path = path
+        self.speed = speed
+        self.files, self.timestamps = self._scan(path)
+        self._index = 0
+        if not self.files:
+            raise FileNotFoundError(f'資料夾內沒有可重播的圖片: {path}')
+
+    @property
+    def frame_count(self):
+        return len(self.files)
+
+    @staticmethod
+    def _scan(path):
+        session_path = os.path.join(path, SESSION_FILE)
+        if os.path.exists(session_path):
+            with open(session_path, encoding='utf-8') as f:
+                entries = json.load(f)['frames']
+            return [e['file'] for e in entries], [e['t'] for e in entries]
+        files = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTS))
+        return files, None
+
+    def _offset(self, index):
+        if self.fps is None:
+            return self.timestamps[index] / self.speed if self.timestamps else None
+        return self._fixed_offset(index)
+
+    def _duration(self):
+        n = len(self.files)
+        if self.fps is None:
+            if not self.timestamps:
+                return 0.0
+            # 最後一張之後再留一個平均間隔
+            return (self.timestamps[-1] + self.timestamps[-1] / max(1, n - 1)) / self.speed
+        return n / self.fps if self.fps else 0.0
+
+    def read(self):
+        if self._index >= len(self.files):
+            if not self.loop:
+                self.finished = True
+                return None
+            self._index = 0
+            self._rewind(self._duration())
+
+        index = self._index
+        self._index += 1
+        self._wait_until(self._offset(index))
+        return load_frame(os.path.join(self.path, self.files[index]))
+
+
+class VideoFrameSource(_ReplaySource):
+    """重播影片檔；fps=None 依影片本身的 fps 播放"""
+
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__(fps, loop)
+        self.path = path
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise FileNotFoundError(f'無法開啟影片: {path}')
+        if self.fps is None:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 0
+        self._index = 0
+
+    @property
+    def frame_count(self):
+        return int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def read(self):
+        ok, bgr = self._cap.read()
+        if not ok:
+            if not self.loop or self._index == 0:
+                self.finished = True
+                return None
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._rewind(self._index / self.fps if self.fps else 0.0)
+            self._index = 0
+            ok, bgr = self._cap.read()
+            if not ok:
+                self.finished = True
+                return None
+
+        self._wait_until(self._fixed_offset(self._index))
+        self._index += 1
+        return Frame(bgr, 'BGR')
+
+    def close(self):
+        self._cap.release()
+
+
+class SessionRecorder:
+    """把畫面與時間戳錄成 DirectoryFrameSource 可重播的 session 資料夾"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = []
+        self._start = None
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, img):
+        now = monotonic()
+        if self._start is None:
+            self._start = now
+        name = '%06d.png' % len(self._entries)
+        Frame.wrap(img).pil.save(os.path.join(self.path, name), 'PNG')
+        self._entries.append({'file': name, 't': round(now - self._start, 4)})
+
+    def write_raw(self, raw):
+        """存一份 screencap 原始 dump（.raw，重播時由 decode_screencap 解析）"""
+        now = monotonic()
+        if self._start is None:
+            self._start = now
+        name = '%06d.raw' % len(self._entries)
+        with open(os.path.join(self.path, name), 'wb') as f:
+            f.write(raw)
+        self._entries.append({'file': name, 't': round(now - self._start, 4)})
+
+    def close(self):
+        with open(os.path.join(self.path, SESSION_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'frames': self._entries}, f, indent=1)
+
+
+class RecordingFrameSource(FrameSource):
+    """包住另一個來源，讀到的每張畫面同時錄進 SessionRecorder"""
+
+    def __init__(self, source, path):
+        self.source = source
+        self.recorder = SessionRecorder(path)
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    def read(self):
+        img = self.source.read()
+        if img is not None:
+            self.recorder.write(img)
+        return img
+
+    def close(self):
+        self.recorder.close()
+        self.source.close()
+
+
+def decode_screencap(raw):
+    """
+    解析 screencap 原始輸出：header（寬、高、格式[、色彩空間]，皆 uint32 LE）+ 像素。
+    回傳的 Frame 直接指向 raw 的記憶體（唯讀 view，不複製）。
+    """
+    if len(raw) < 12:
+        raise ValueError('screencap 資料太短: %d bytes' % len(raw))
+    width, height, fmt = struct.unpack_from('<3I', raw)
+    order = SCREENCAP_FORMATS.get(fmt)
+    if order is None:
+        raise ValueError('不支援的 screencap 格式: %d' % fmt)
+    # Android 9 以後 header 多一個 colorspace 欄位（16 bytes）
+    header = len(raw) - width * height * 4
+    if header not in (12, 16):
+        raise ValueError('screencap 大小不符: %dx%d, %d bytes' % (width, height, len(raw)))
+    pixels = np.frombuffer(raw, dtype=np.uint8, count=width * height * 4, offset=header)
+    return Frame(pixels.reshape(height, width, 4), order)
+
+
+def load_frame(path):
+    """從檔案載入一張畫面（BGR ndarray 包成 Frame，不經過 PIL；.raw 為 screencap dump）"""
+    if path.endswith('.raw'):
+        with open(path, 'rb') as f:
+            return decode_screencap(f.read())
+    bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise IOError(f'無法讀取圖片: {path}')
+    return Frame(bgr, 'BGR')
+
+
+def create_capture_source(wName, kind=None):
+    """依設定建立非 win32 的即時截圖來源；kind 為 win32 時回傳 None（由 PlayerThread 找視窗）"""
+    kind = kind or emulator_config.capture_backend
+    if kind == 'screencap':
+        return AdbScreencapSource(wName)
+    if kind == 'screenrecord':
+        return ScreenrecordSource(wName)
+    if kind != 'win32':
+        log.warning('未知的 CaptureBackend: %s，改用 win32', kind)
+    return None
+
+
+def open_replay_source(path, fps=None, loop=False):
+    """依路徑自動選擇資料夾或影片重播來源"""
+    if os.path.isdir(path):
+        return DirectoryFrameSource(path, fps=fps, loop=loop)
+    return VideoFrameSource(path, fps=fps, loop=loop)
@@ -0,0 +1,490 @@
+"""
+輸入後端 — pressKey 最終把點擊座標交給這裡送進模擬器。
+
+    ConsoleInput   : 每次點擊都透過 NoxConsole 執行 `shell input tap`（原本的做法，最慢但不需 serial）
+    AdbShellInput  : 每個裝置維持一個常駐的 `adb shell`，點擊只是寫一行指令進 stdin；
+                     定期及每送出幾次點擊後用 echo 標記做健康檢查，process 掛掉時自動重開並補送
+    MonkeyInput    : 在裝置上跑 `monkey --port`，經 `adb forward` 維持一條 TCP 連線送 `tap x y`，
+                     不必每次點擊都啟動一個 app_process（約 200~500ms → 數 ms）
+    AdbSocketInput : 直接跟 adb server（TCP 5037）說 host protocol，常駐 shell 串流由
+                     santa.adb_client 依裝置共用，完全不 spawn 外部程式
+
+由 Main.ini [Emulator] InputBackend = console / adbshell / monkey / adbsocket 選擇，見 create_input_backend()。
+
+使用方式:
+    backend = create_input_backend(wName)
+    backend.tap(x, y)
+    backend.close()
+"""
+import re
+import socket
+import subprocess
+from itertools import count
+from queue import Queue, Empty
+from threading import Lock, Thread
+from time import monotonic, sleep
+
+from santa.adb_client import AdbError, get_client
+from santa.config import emulator_config
+from santa.logger import log
+
+# Windows 上開子 process 時不要跳出主控台視窗
+_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+_SERIAL_RE = re.compile(r'([\w\.\-]+:\d+|emulator-\d+)')
+
+
+class InputBackend:
+    """輸入後端介面：tap(x, y) 送出一次點擊（座標已換算成模擬器解析度）"""
+
+    def tap(self, x, y):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleInput(InputBackend):
+    """每次點擊都經由 NoxConsole 執行 adb（原本 PlayerThread.adb_tap 的做法）"""
+
+    def __init__(self, wName):
+        self.wName = wName
+
+    def tap(self, x, y):
+        execCmd = emulator_config.build_adb_tap_cmd(self.wName, x, y)
+        try:
+            result = subprocess.run(execCmd, shell=True, capture_output=True, text=True, timeout=10)
+            rst = result.stdout.strip()
+            if rst and rst[0:5] == 'error':
+                log.error('ADB error: %s', rst)
+                # 安全截取 IP 避免分割錯誤
+                match = re.search(r'([\d\.]+:[\d]+)', rst)
+                if match:
+                    ipAddr = match.group(1)
+                    log.info('嘗試重新連線: %s', ipAddr)
+                    reconnectCmd = emulator_config.build_adb_connect_cmd(ipAddr)
+                    reconnResult = subprocess.run(reconnectCmd, shell=True, capture_output=True, text=True, timeout=10)
+                    log.info('重連結果: %s', reconnResult.stdout.strip())
+                else:
+                    log.error('無法從 ADB 錯誤中解析出 IP 位址')
+        except subprocess.TimeoutExpired:
+            log.warning('adb_tap 逾時: %s', self.wName)
+        except Exception as e:
+            log.error('adb_tap 錯誤: %s', e)
+
+
+class AdbShellSession:
+    """一個常駐的 adb shell process：stdin 寫指令，背景 thread 收 stdout"""
+
+    MARKER = '__linm_alive_'
+
+    def __init__(self, argv):
+        self.argv = argv
+        self._ids = count()
+        self._lines = Queue()
+        self._proc = subprocess.Popen(
+            argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            bufsize=0, creationflags=_NO_WINDOW)
+        self._reader = Thread(target=self._read_loop, name='adb-shell-reader', daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        for raw in iter(self._proc.stdout.readline, b''):
+            line = raw.decode('utf-8', 'replace').strip()
+            if line.startswith(self.MARKER):
+                self._lines.put(line)
+            elif line:
+                log.warning('adb shell: %s', line)
+        self._lines.put(None)  # EOF
+
+    @property
+    def alive(self):
+        return self._proc.poll() is None
+
+    def send(self, command):
+        """寫入一行 shell 指令（不等待結果）；pipe 斷掉時丟出 OSError"""
+        self._proc.stdin.write((command + '\n').encode('utf-8'))
+        self._proc.stdin.flush()
+
+    def ping(self, timeout=2.0):
+        """echo 一個標記並等它回來，確認 shell 仍在處理指令"""
+        token = '%s%d' % (self.MARKER, next(self._ids))
+        try:
+            self.send('echo ' + token)
+        except OSError:
+            return False
+        deadline = monotonic() + timeout
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                line = self._lines.get(timeout=remaining)
+            except Empty:
+                return False
+            if line is None:
+                return False
+            if line == token:
+                return True
+
+    def close(self):
+        if self.alive:
+            try:
+                self.send('exit')
+                self._proc.stdin.close()
+                self._proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+
+
+class AdbShellInput(InputBackend):
+    """每個裝置一個常駐 adb shell；健康檢查失敗或 process 結束時自動重開"""
+
+    HEALTH_INTERVAL = 10    # 距離上次確認超過幾秒，點擊前先 ping 一次
+    BURST_PING = 3          # 連續送出幾次點擊後，下一次點擊前也先 ping（寫入 pipe 成功不代表 shell 還活著）
+    RESPAWN_BACKOFF = 5     # 重開失敗後幾秒內不再嘗試，改走 fallback
+
+    def __init__(self, wName, serial=None, argv=None, fallback=None):
+        """
+        Args:
+            wName: 模擬器視窗名稱（用來查 serial，並給 fallback 使用）
+            serial: 已知的 adb serial；None 時透過 NoxConsole 查一次
+            argv: 自訂 shell 指令（測試時指向假的 adb）；None 時用 emulator_config 組出
+            fallback: 常駐 shell 不可用時改用的後端，預設 ConsoleInput
+        """
+        self.wName = wName
+        self.serial = serial
+        self._argv = argv
+        self._fallback = fallback or ConsoleInput(wName)
+        self._session = None
+        self._lastHealthy = 0.0
+        self._lastFailure = None
+        self._unconfirmed = []  # 上次 ping 成功後送出的點擊，shell 掉了就改由 fallback 補送
+        self._lock = Lock()
+
+    def _build_argv(self):
+        if self._argv is not None:
+            return self._argv
+        if self.serial is None:
+            self.serial = resolve_serial(self.wName)
+            if self.serial is None:
+                return None
+        return emulator_config.build_adb_shell_argv(self.serial)
+
+    def _spawn(self):
+        """開一個新的 shell 並確認它能回應；失敗回傳 None"""
+        argv = self._build_argv()
+        if argv is None:
+            return None
+        try:
+            session = AdbShellSession(argv)
+        except OSError as e:
+            log.error('無法啟動 adb shell [%s]: %s', self.wName, e)
+            return None
+        if not session.ping():
+            log.error('adb shell 沒有回應 [%s]', self.wName)
+            session.close()
+            return None
+        log.info('adb shell 已連線 [%s] serial=%s', self.wName, self.serial)
+        return session
+
+    def _ensure_session(self):
+        """取得健康的 session；必要時健康檢查或重開"""
+        now = monotonic()
+        session = self._session
+        if session is not None:
+            if not session.alive:
+                log.warning('adb shell 已結束，重新啟動 [%s]', self.wName)
+            elif (now - self._lastHealthy < self.HEALTH_INTERVAL
+                  and len(self._unconfirmed) < self.BURST_PING):
+                return session
+            elif session.ping():
+                self._lastHealthy = now
+                self._unconfirmed.clear()
+                return session
+            else:
+                log.warning('adb shell 健康檢查失敗，重新啟動 [%s]', self.wName)
+            self._drop_session()
+
+        if self._lastFailure is not None and now - self._lastFailure < self.RESPAWN_BACKOFF:
+            return None
+        session = self._spawn()
+        if session is None:
+            self._lastFailure = now
+            return None
+        self._session = session
+        self._lastHealthy = monotonic()
+        self._lastFailure = None
+        return session
+
+    def _drop_session(self):
+        """丟掉已失效的 session；還沒確認的點擊可能沒被執行，改由 fallback 補送"""
+        self._session.close()
+        self._session = None
+        lost, self._unconfirmed = self._unconfirmed, []
+        if lost:
+            log.warning('adb shell 失效前有 %d 次點擊未確認，改用 fallback 補送 [%s]', len(lost), self.wName)
+        for x, y in lost:
+            self._fallback.tap(x, y)
+
+    def tap(self, x, y):
+        command = 'input tap %d %d' % (x, y)
+        with self._lock:
+            for attempt in range(2):
+                session = self._ensure_session()
+                if session is None:
+                    break
+                try:
+                    session.send(command)
+                except OSError as e:
+                    # pipe 斷了：丟掉 session，下一輪重開再送一次
+                    log.warning('adb shell 寫入失敗 [%s]: %s', self.wName, e)
+                    self._drop_session()
+                    continue
+                if session.alive:
+                    self._unconfirmed.append((x, y))
+                    return
+                # 寫進 pipe 了但 shell 已結束：這次點擊不算數，下一輪重開再送一次
+                log.warning('adb shell 寫入後已結束 [%s]', self.wName)
+                self._drop_session()
+        self._fallback.tap(x, y)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self._fallback.close()
+
+
+class MonkeyInput(InputBackend):
+    """monkey 文字協定：一條 TCP 連線，每次點擊送一行 `tap x y` 並等待 OK"""
+
+    CONNECT_TIMEOUT = 3.0   # 啟動 monkey 後等待可連線的時間
+    REPLY_TIMEOUT = 1.0
+    RECONNECT_BACKOFF = 5
+
+    def __init__(self, wName, serial=None, address=None, fallback=None):
+        """
+        Args:
+            wName: 模擬器視窗名稱
+            serial: 已知的 adb serial；None 時透過 NoxConsole 查一次
+            address: 直接連線的 (host, port)，不啟動 monkey / adb forward（測試時指向假的 server）
+            fallback: monkey 不可用時改用的後端，預設 AdbShellInput
+        """
+        self.wName = wName
+        self.serial = serial
+        self._address = address
+        self._fallback = fallback or AdbShellInput(wName, serial)
+        self._monkey = None     # 裝置上 monkey 的 adb shell process
+        self._localPort = None  # adb forward 的本機 port；連線中斷後沿用，只在 close() 或 forward 已消失時放掉
+        self._sock = None
+        self._reader = None
+        self._lastFailure = None
+        self._lock = Lock()
+
+    def _start_monkey(self):
+        """在裝置上啟動 monkey 並 forward 到本機任一空閒 port，回傳 (host, port) 或 None"""
+        if self.serial is None:
+            self.serial = resolve_serial(self.wName)
+            if self.serial is None:
+                return None
+        devicePort = emulator_config.monkey_port
+        try:
+            if self._monkey is None or self._monkey.poll() is not None:
+                self._monkey = subprocess.Popen(
+                    emulator_config.build_adb_argv(self.serial, 'shell', 'monkey', '--port', str(devicePort)),
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    creationflags=_NO_WINDOW)
+            if not self._has_forward(devicePort):
+                result = self._adb('forward', 'tcp:0', 'tcp:%d' % devicePort)
+                self._localPort = int(result.stdout.strip())
+        except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+            log.error('無法啟動 monkey [%s]: %s', self.wName, e)
+            return None
+        return '127.0.0.1', self._localPort
+
+    def _adb(self, *args):
+        return subprocess.run(emulator_config.build_adb_argv(self.serial, *args),
+                              capture_output=True, text=True, timeout=10, creationflags=_NO_WINDOW)
+
+    def _has_forward(self, devicePort):
+        """上次建立的 forward 是否還在（adb server 重啟後會消失）"""
+        if self._localPort is None:
+            return False
+        entry = '%s tcp:%d tcp:%d' % (self.serial, self._localPort, devicePort)
+        if any(line.strip() == entry for line in self._adb('forward', '--list').stdout.splitlines()):
+            return True
+        self._localPort = None
+        return False
+
+    def _remove_forward(self):
+        if self._localPort is None:
+            return
+        try:
+            self._adb('forward', '--remove', 'tcp:%d' % self._localPort)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            log.warning('無法移除 adb forward [%s] tcp:%d: %s', self.wName, self._localPort, e)
+        self._localPort = None
+
+    def _connect(self):
+        address = self._address or self._start_monkey()
+        if address is None:
+            return False
+        deadline = monotonic() + self.CONNECT_TIMEOUT
+        while True:
+            try:
+                self._sock, self._reader = self._handshake(address)
+                break
+            except OSError as e:
+                # monkey 剛啟動時還沒開始 listen（adb forward 仍會接受連線，要等 wake 回 OK），稍等再試
+                if monotonic() >= deadline:
+                    log.error('無法連線 monkey [%s] %s: %s', self.wName, address, e)
+                    return False
+                sleep(0.2)
+        log.info('monkey 已連線 [%s] %s:%d', self.wName, *address)
+        return True
+
+    def _handshake(self, address):
+        """連線後送一次 wake（no-op），收到 OK 才算 monkey 已就緒；回傳 (sock, reader)"""
+        sock = socket.create_connection(address, timeout=self.REPLY_TIMEOUT)
+        reader = sock.makefile('rb')
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.sendall(b'wake\n')
+            reply = reader.readline()
+            if not reply.startswith(b'OK'):
+                raise ConnectionError('monkey 尚未就緒: %r' % reply.strip())
+        except OSError:
+            reader.close()
+            sock.close()
+            raise
+        return sock, reader
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _send(self, command):
+        """送出一行指令並讀回覆；True = OK"""
+        self._sock.sendall((command + '\n').encode('ascii'))
+        reply = self._reader.readline()
+        if not reply:
+            raise ConnectionError('monkey 連線已關閉')
+        if not reply.startswith(b'OK'):
+            log.warning('monkey 回覆錯誤 [%s]: %s -> %s', self.wName, command, reply.strip())
+            return False
+        return True
+
+    def tap(self, x, y):
+        command = 'tap %d %d' % (x, y)
+        with self._lock:
+            for attempt in range(2):
+                fresh = self._sock is None
+                if fresh:
+                    now = monotonic()
+                    if self._lastFailure is not None and now - self._lastFailure < self.RECONNECT_BACKOFF:
+                        break
+                    if not self._connect():
+                        self._lastFailure = now
+                        break
+                try:
+                    self._send(command)
+                    self._lastFailure = None
+                    return
+                except OSError as e:
+                    log.warning('monkey 連線中斷 [%s]: %s', self.wName, e)
+                    self._disconnect()
+                    if fresh:
+                        # 剛連上就斷：視為連線失敗，RECONNECT_BACKOFF 內直接走 fallback
+                        self._lastFailure = now
+                        break
+        self._fallback.tap(x, y)
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.sendall(b'quit\n')
+                except OSError:
+                    pass
+            self._disconnect()
+            self._remove_forward()
+            if self._monkey is not None and self._monkey.poll() is None:
+                self._monkey.kill()
+            self._monkey = None
+        self._fallback.close()
+
+
+class AdbSocketInput(InputBackend):
+    """經由 adb server socket 的常駐 shell 送點擊；失敗時退回 AdbShellInput"""
+
+    RETRY_BACKOFF = 5
+
+    def __init__(self, wName, serial=None, client=None, fallback=None):
+        """
+        Args:
+            wName: 模擬器視窗名稱
+            serial: 已知的 adb serial；None 時透過 NoxConsole 查一次
+            client: AdbClient（測試時指向假的 server）；None 時用全域共用的 client
+            fallback: adb server 不可用時改用的後端，預設 AdbShellInput
+        """
+        self.wName = wName
+        self.serial = serial
+        self._client = client
+        self._fallback = fallback or AdbShellInput(wName, serial)
+        self._lastFailure = None
+
+    def tap(self, x, y):
+        now = monotonic()
+        if self._lastFailure is None or now - self._lastFailure >= self.RETRY_BACKOFF:
+            if self.serial is None:
+                self.serial = resolve_serial(self.wName)
+            if self.serial is not None:
+                try:
+                    (self._client or get_client()).device(self.serial).tap(x, y)
+                    self._lastFailure = None
+                    return
+                except (AdbError, OSError) as e:
+                    log.warning('adb socket 點擊失敗 [%s]: %s', self.wName, e)
+            self._lastFailure = now
+        self._fallback.tap(x, y)
+
+    def close(self):
+        # 裝置連線由 client 共用，這裡只關自己的 fallback
+        self._fallback.close()
+
+
+def resolve_serial(wName):
+    """透過 NoxConsole 查詢視窗對應的 adb serial（例如 127.0.0.1:62001）"""
+    try:
+        result = subprocess.run(emulator_config.build_adb_serial_cmd(wName), shell=True,
+                                capture_output=True, text=True, timeout=10)
+    except (subprocess.TimeoutExpired, OSError) as e:
+        log.error('查詢 adb serial 失敗 [%s]: %s', wName, e)
+        return None
+    match = _SERIAL_RE.search(result.stdout)
+    if match is None:
+        log.error('無法解析 adb serial [%s]: %s', wName, result.stdout.strip())
+        return None
+    return match.group(1)
+
+
+def create_input_backend(wName, kind=None):
+    """依設定建立輸入後端（kind 預設取 emulator_config.input_backend）"""
+    kind = kind or emulator_config.input_backend
+    if kind == 'console':
+        return ConsoleInput(wName)
+    if kind == 'monkey':
+        return MonkeyInput(wName)
+    if kind == 'adbsocket':
+        return AdbSocketInput(wName)
+    if kind != 'adbshell':
+        log.warning('未知的 InputBackend: %s，改用 adbshell', kind)
+    return AdbShellInput(wName)
@@ -0,0 +1,136 @@
+"""
+每個玩家一個的按鍵派送器 — _tick 只負責排入按鍵，實際點擊由背景 worker 送出，
+偵測迴圈不再被 adb 延遲或連按之間的 sleep 卡住。
+
+    - 佇列有上限，滿了會擠掉優先度最低的項目（回捲、瞬移永遠排在攻擊前面）
+    - 同一個按鍵還在排隊時不重複排入，只合併成較高的優先度 / 較多的次數
+
+使用方式:
+    dispatcher = InputDispatcher(lambda key: player.adb_tap(wName, key), name='Player-0')
+    dispatcher.submit(backHomeKey, PRIORITY_URGENT, repeat=5, interval=0.5)
+    dispatcher.close()
+"""
+from itertools import count
+from threading import Condition, Thread
+from time import sleep
+
+from santa.logger import log
+
+# 數字越小越優先
+PRIORITY_URGENT = 0   # 回捲
+PRIORITY_ESCAPE = 1   # 瞬移
+PRIORITY_HEAL = 2     # 解毒、治癒
+PRIORITY_NORMAL = 3   # 攻擊、魂體轉換、其他
+
+
+class _Pending:
+    __slots__ = ('key', 'priority', 'seq', 'repeat', 'interval')
+
+    def __init__(self, key, priority, seq, repeat, interval):
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self.repeat = repeat
+        self.interval = interval
+
+    def order(self):
+        return self.priority, self.seq
+
+
+class InputDispatcher:
+    """有優先度、會合併重複按鍵的非同步按鍵佇列（單一 worker thread 依序送出）"""
+
+    def __init__(self, send, maxsize=8, name='input'):
+        """
+        Args:
+            send: fn(key)，在 worker thread 上實際送出一次點擊
+            maxsize: 同時排隊的按鍵上限
+        """
+        self._send = send
+        self.maxsize = maxsize
+        self.name = name
+        self._pending = []
+        self._seq = count()
+        self._cond = Condition()
+        self._closed = False
+        # 統計
+        self.submitted = 0
+        self.collapsed = 0
+        self.dropped = 0
+        self.sent = 0
+        self._worker = Thread(target=self._run, name=f'{name}-input', daemon=True)
+        self._worker.start()
+
+    def submit(self, key, priority=PRIORITY_NORMAL, repeat=1, interval=0.0):
+        """
+        排入按鍵，立即返回。
+
+        Returns:
+            True = 已排入（或合併進既有項目），False = 佇列已滿被丟棄
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.submitted += 1
+
+            # 同一按鍵還沒送出：合併，不重複排隊
+            for item in self._pending:
+                if item.key == key:
+                    item.priority = min(item.priority, priority)
+                    item.repeat = max(item.repeat, repeat)
+                    item.interval = max(item.interval, interval)
+                    self.collapsed += 1
+                    return True
+
+            if len(self._pending) >= self.maxsize:
+                worst = max(self._pending, key=_Pending.order)
+                if worst.priority <= priority:
+                    self.dropped += 1
+                    log.warning('%s: 按鍵佇列已滿，丟棄 %s', self.name, key)
+                    return False
+                self._pending.remove(worst)
+                self.dropped += 1
+                log.warning('%s: 按鍵佇列已滿，擠掉 %s', self.name, worst.key)
+
+            self._pending.append(_Pending(key, priority, next(self._seq), repeat, interval))
+            self._cond.notify()
+            return True
+
+    @property
+    def pending(self):
+        """目前排隊中的按鍵數"""
+        with self._cond:
+            return len(self._pending)
+
+    def _take(self):
+        """取出優先度最高（同優先度先進先出）的項目；關閉時回傳 None"""
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            item = min(self._pending, key=_Pending.order)
+            self._pending.remove(item)
+            return item
+
+    def _run(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return
+            for n in range(item.repeat):
+                if n and item.interval:
+                    sleep(item.interval)
+                try:
+                    self._send(item.key)
+                    self.sent += 1
+                except Exception as e:
+                    log.error('%s: 送出按鍵 %s 失敗: %s', self.name, item.key, e)
+
+    def close(self, timeout=2.0):
+        """停止 worker；還沒送出的按鍵直接丟棄"""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._worker.join(timeout)
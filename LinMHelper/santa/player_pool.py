@@ -0,0 +1,191 @@
+"""
+玩家共用的 worker pool — 玩家不再各自佔一條大部分時間都在 sleep 的 thread，
+而是依「下一次 tick 的時間」排進同一個 heap，由固定幾條 worker thread 輪流執行。
+
+    排程：最早到期的玩家先跑（同時到期則先排入者先跑），跑完一個 tick 後
+          依 TickScheduler 算出的下一次時間重新排入
+    公平：每位玩家記錄 tick 數與延遲（實際開始 - 應該開始）
+    過載：定期檢查平均延遲，超過目標週期的 OVERLOAD_RATIO 就寫 log 警告（建議增加 PoolWorkers）
+
+Main.ini:
+    [Runtime]
+    ExecutionMode = pool
+    PoolWorkers = 4
+
+使用方式:
+    pool = PlayerPool(workers=4)
+    player = pool.wrap(PlayerThread(i, app, ...))   # 介面與 PlayerThread 相同（start / is_alive）
+    player.start()
+    pool.stats()                                    # 每位玩家的 tick 數、平均/最大延遲
+    pool.close()
+"""
+import heapq
+from itertools import count
+from threading import Condition, Thread
+from time import monotonic
+
+from santa.logger import log
+
+
+class PooledPlayer:
+    """排在 PlayerPool 裡的一位玩家（包住未啟動的 PlayerThread）"""
+
+    def __init__(self, pool, player):
+        self.pool = pool
+        self.player = player
+        self.i = player.i
+        self.ctx = None
+        self.alive = False
+        # 統計（自上次過載檢查後）
+        self.ticks = 0
+        self.lateSum = 0.0
+        self.lateMax = 0.0
+        self.busySum = 0.0
+        self.totalTicks = 0
+
+    def start(self):
+        self.alive = True
+        self.pool._push(monotonic(), self)
+
+    def is_alive(self):
+        return self.alive
+
+    def _record(self, late, busy):
+        self.ticks += 1
+        self.totalTicks += 1
+        self.lateSum += late
+        self.lateMax = max(self.lateMax, late)
+        self.busySum += busy
+
+    def _reset_window(self):
+        self.ticks = 0
+        self.lateSum = 0.0
+        self.lateMax = 0.0
+        self.busySum = 0.0
+
+
+class PlayerPool:
+    """固定數量 worker thread 依到期時間執行所有玩家的 tick"""
+
+    OVERLOAD_RATIO = 0.5   # 平均延遲超過目標週期的一半視為過載
+    REPORT_SEC = 30        # 過載檢查間隔
+
+    def __init__(self, workers=4, name='PlayerPool'):
+        self.name = name
+        self._heap = []
+        self._seq = count()
+        self._cond = Condition()
+        self._closed = False
+        self._members = []
+        self._lastReport = monotonic()
+        self._workers = [Thread(target=self._run, name=f'{name}-{k}', daemon=True) for k in range(workers)]
+        for t in self._workers:
+            t.start()
+        log.info('%s: %d 條 worker thread', name, workers)
+
+    def wrap(self, player) -> PooledPlayer:
+        return PooledPlayer(self, player)
+
+    def _push(self, due, job):
+        with self._cond:
+            if job not in self._members:
+                self._members.append(job)
+            heapq.heappush(self._heap, (due, next(self._seq), job))
+            self._cond.notify()
+
+    def _take(self):
+        """等到最早到期的玩家可以執行，取出 (due, job)；關閉時回傳 None"""
+        with self._cond:
+            while not self._closed:
+                if self._heap:
+                    wait = self._heap[0][0] - monotonic()
+                    if wait <= 0:
+                        due, _, job = heapq.heappop(self._heap)
+                        return due, job
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _run(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return
+            due, job = item
+            start = monotonic()
+            if job.ctx is None:
+                job.ctx = job.player.open_session()
+                if job.ctx is None:
+                    self._retire(job)
+                    continue
+            if not job.player.step(job.ctx):
+                self._retire(job)
+                continue
+            job._record(start - due, monotonic() - start)
+            self._push(job.ctx['scheduler'].due, job)
+            self._maybe_report()
+
+    def _retire(self, job):
+        job.alive = False
+        with self._cond:
+            if job in self._members:
+                self._members.remove(job)
+
+    # ====== 統計 / 過載 ======
+
+    def stats(self):
+        """每位玩家自上次過載檢查以來的 [{i, ticks, lateAvgMs, lateMaxMs, busyAvgMs, fps, tier, totalTicks}]"""
+        with self._cond:
+            members = list(self._members)
+        return [self._job_stats(job) for job in members]
+
+    @staticmethod
+    def _job_stats(job):
+        n = job.ticks or 1
+        scheduler = job.ctx['scheduler'] if job.ctx else None
+        return {
+            'i': job.i,
+            'ticks': job.ticks,
+            'lateAvgMs': job.lateSum / n * 1000,
+            'lateMaxMs': job.lateMax * 1000,
+            'busyAvgMs': job.busySum / n * 1000,
+            'fps': scheduler.achieved_fps if scheduler else 0.0,
+            'tier': scheduler.tier if scheduler else '',
+            'totalTicks': job.totalTicks,
+        }
+
+    def _maybe_report(self):
+        now = monotonic()
+        with self._cond:
+            if now - self._lastReport < self.REPORT_SEC:
+                return
+            elapsed = now - self._lastReport
+            self._lastReport = now
+            members = list(self._members)
+
+        busy = 0.0
+        overloaded = []
+        for job in members:
+            s = self._job_stats(job)
+            busy += job.busySum
+            scheduler = job.ctx['scheduler'] if job.ctx else None
+            if scheduler and job.ticks:
+                period = 1.0 / scheduler.rates[scheduler.tier]
+                if job.lateSum / job.ticks > period * self.OVERLOAD_RATIO:
+                    overloaded.append(s)
+            job._reset_window()
+
+        load = busy / (elapsed * len(self._workers))
+        if overloaded:
+            log.warning('%s 過載：worker 使用率 %.0f%%，%d 位玩家落後（%s），建議增加 PoolWorkers',
+                        self.name, load * 100, len(overloaded),
+                        '，'.join('#%d 平均延遲%dms' % (s['i'], s['lateAvgMs']) for s in overloaded))
+        else:
+            log.debug('%s：worker 使用率 %.0f%%，%d 位玩家', self.name, load * 100, len(members))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify_all()
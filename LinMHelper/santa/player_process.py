@@ -0,0 +1,189 @@
+"""
+Process 執行模式 — 每個玩家的 截圖→偵測→決策 迴圈跑在自己的 worker process，
+純 Python 的像素偵測不再共用同一個 GIL，玩家數增加時每個 tick 的延遲維持不變。
+GUI process 只收到精簡的狀態紀錄（與 _gui_queue 相同的 tuple）。
+
+    GUI process                              worker process（每個玩家一個）
+    PlayerProcess.start()  ───spawn───▶      _player_main → PlayerThread.run()
+    running / hideWindow / showIndex  ─共享─▶ 每個 tick 讀取
+    BossScheduler 事件    ───Queue───▶       bossSub.poll()
+    _gui_queue ◀── pump thread ◀── Queue ◀── ('status', i, text) / ('frame', i, seq)
+    FrameRing（共享記憶體）: preview ←─ 預覽圖，GUI 以 seq 讀取
+
+Main.ini:
+    [Runtime]
+    ExecutionMode = process      # 預設 thread
+
+使用方式:
+    host = ProcessHost(app._gui_queue, app.bossScheduler)
+    player = host.create(i, wName, wProfile)
+    player.start()
+    player.stop()                # 通知 worker 停止（與 thread 模式按鈕切換相同）
+    host.preview_image(i, seq)   # 'frame' 訊息 → PIL Image
+    host.close()
+"""
+import multiprocessing
+import queue
+from threading import Thread, current_thread
+
+import numpy as np
+from PIL import Image
+
+from santa.boss_scheduler import BossSubscription
+from santa.frame_ring import FrameRing
+from santa.logger import log
+
+
+class _ForwardSubscription(BossSubscription):
+    """GUI process 端的收件匣：收到世界王事件直接轉送到 worker 的 queue"""
+
+    def __init__(self, i, bossQueue):
+        super().__init__(i)
+        self._bossQueue = bossQueue
+
+    def _deliver(self, slot):
+        self._bossQueue.put(slot)
+
+
+class _QueueInbox:
+    """worker 端的收件匣，介面與 BossSubscription.poll 相同"""
+
+    def __init__(self, bossQueue):
+        self._bossQueue = bossQueue
+
+    def poll(self):
+        try:
+            return self._bossQueue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class _RemoteBossScheduler:
+    """給 worker 內 PlayerThread 用的 boss_scheduler：訂閱即讀取 GUI process 轉送的事件"""
+
+    def __init__(self, bossQueue):
+        self._bossQueue = bossQueue
+
+    def subscribe(self, i):
+        return _QueueInbox(self._bossQueue)
+
+    def unsubscribe(self, sub):
+        pass
+
+
+def _player_main(i, wName, wProfile, running, hideWindow, showIndex, statusQueue, bossQueue, previewName):
+    """worker process 進入點：在 process 的主線程直接執行 PlayerThread.run()"""
+    from santa.config import emulator_config
+    from santa.PlayerThread import PlayerThread
+
+    current_thread().name = f'Player-{i}'
+    emulator_config.load_from_ini('Main.ini')
+    previewRing = FrameRing.attach(previewName)
+
+    def on_image_update(i, img):
+        # 預覽圖寫進共享記憶體，queue 只送 seq
+        statusQueue.put(('frame', i, previewRing.publish(np.asarray(img), img.mode)))
+
+    player = PlayerThread(
+        i, None,
+        on_status_update=lambda i, text: statusQueue.put(('status', i, text)),
+        on_image_update=on_image_update,
+        get_running_state=lambda i: running.is_set(),
+        get_hide_window=lambda: hideWindow.value == 1,
+        get_show_index=lambda: showIndex.value,
+        boss_scheduler=_RemoteBossScheduler(bossQueue),
+        wName=wName, wProfile=wProfile,
+    )
+    try:
+        player.run()
+    finally:
+        previewRing.close()
+
+
+class PlayerProcess:
+    """一個玩家的 worker process；GUI 端用法與 PlayerThread 相同（start / is_alive）"""
+
+    def __init__(self, host, i, wName, wProfile):
+        self.host = host
+        self.i = i
+        self.wName = wName
+        self.wProfile = wProfile
+        self._running = host.mp.Event()
+        self._bossQueue = host.mp.Queue()
+        self._bossSub = None
+        self._process = None
+
+    def start(self):
+        self._running.set()
+        if self.host.bossScheduler is not None:
+            self._bossSub = self.host.bossScheduler.add_subscription(_ForwardSubscription(self.i, self._bossQueue))
+        preview = self.host.preview_ring(self.i)
+        self._process = self.host.mp.Process(
+            target=_player_main, name=f'Player-{self.i}', daemon=True,
+            args=(self.i, self.wName, self.wProfile, self._running, self.host.hideWindow,
+                  self.host.showIndex, self.host.statusQueue, self._bossQueue,
+                  preview.name))
+        self._process.start()
+        log.info('Player-%d 以 worker process 執行 (pid=%d)', self.i, self._process.pid)
+
+    def stop(self):
+        """通知 worker 在目前 tick 結束後停止"""
+        self._running.clear()
+        if self._bossSub is not None:
+            self.host.bossScheduler.unsubscribe(self._bossSub)
+            self._bossSub = None
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+
+class ProcessHost:
+    """process 模式的共用資源：spawn context、共享旗標、每個玩家的預覽 FrameRing、狀態 queue 與 pump thread"""
+
+    def __init__(self, guiQueue, bossScheduler=None):
+        # Windows 只支援 spawn；其他平台也用 spawn，避免 fork 帶著 Tk 與背景 thread 的狀態
+        self.mp = multiprocessing.get_context('spawn')
+        self.bossScheduler = bossScheduler
+        self.hideWindow = self.mp.Value('b', 0, lock=False)
+        self.showIndex = self.mp.Value('i', -1, lock=False)
+        self.statusQueue = self.mp.Queue()
+        self._guiQueue = guiQueue
+        self._rings = {}  # i -> 預覽 ring，重新啟動玩家時沿用
+        self._pump = Thread(target=self._pump_loop, name='ProcessHost-pump', daemon=True)
+        self._pump.start()
+
+    def create(self, i, wName, wProfile) -> PlayerProcess:
+        return PlayerProcess(self, i, wName, wProfile)
+
+    def preview_ring(self, i):
+        """玩家 i 的預覽 ring，第一次用到才配置"""
+        if i not in self._rings:
+            self._rings[i] = FrameRing.create(slots=2)
+        return self._rings[i]
+
+    def preview_image(self, i, seq):
+        """'frame' 訊息的 seq → PIL Image；已被新的預覽覆寫時回傳 None"""
+        ring = self.preview_ring(i)
+        arr = ring.view(seq)
+        if arr is None:
+            return None
+        img = Image.fromarray(np.array(arr))
+        # 複製途中 worker 可能已覆寫這格（預覽只有 2 格），丟掉撕裂的畫面
+        if not ring.valid(seq):
+            return None
+        return img
+
+    def _pump_loop(self):
+        while True:
+            msg = self.statusQueue.get()
+            if msg is None:
+                return
+            self._guiQueue.put(msg)
+
+    def close(self):
+        """停止 pump thread 並釋放所有預覽 ring；必須在 worker process 都結束後呼叫"""
+        self.statusQueue.put(None)
+        for ring in self._rings.values():
+            ring.close()
+            ring.unlink()
+        self._rings.clear()
@@ -0,0 +1,113 @@
+"""
+重播壓測工具 — 不開模擬器，把錄好的畫面餵給 PlayerThread 的偵測→決策流程並統計耗時。
+
+使用方式:
+    python -m santa.replay <資料夾或影片> [--profile default.ini] [--fps 0] [--loop 3]
+    python -m santa.replay --record <window_name> <輸出資料夾> [--fps 2] [--count 300]
+
+按鍵不會真的送出，只記錄次數；--fps 0（預設）代表不限速，量的是純計算時間。
+"""
+import argparse
+from collections import Counter
+from time import perf_counter, sleep
+
+import numpy as np
+
+from santa.PlayerThread import PlayerThread
+from santa.frame_source import SessionRecorder, Win32FrameSource, open_replay_source
+
+
+class ReplayPlayer(PlayerThread):
+    """不送按鍵、不發聲的 PlayerThread，供重播壓測使用"""
+
+    def __init__(self, source, wProfile='', i=0):
+        super().__init__(i, None, on_status_update=self._record_status,
+                         get_running_state=lambda i: True, get_hide_window=lambda: False,
+                         frame_source=source, wName='replay', wProfile=wProfile)
+        self.keys = Counter()
+        self.lastStatus = ''
+
+    def _record_status(self, i, text):
+        self.lastStatus = text
+
+    def pressKey(self, hwnd, wName, key, priority=None, repeat=1, interval=0.0):
+        self.keys[str(key)] += repeat
+
+    def doBeep(self, cnt):
+        pass
+
+
+def run_benchmark(source, wProfile='', maxTicks=None):
+    """逐張跑 _tick（不做決策後的 sleep），回傳 (每 tick 毫秒數 ndarray, ReplayPlayer)"""
+    player = ReplayPlayer(source, wProfile)
+    ctx = player._init_session()
+    costs = []
+    try:
+        while not source.finished and (maxTicks is None or len(costs) < maxTicks):
+            start = perf_counter()
+            player._tick(ctx)
+            costs.append((perf_counter() - start) * 1000)
+    finally:
+        source.close()
+    # 最後一次 read() 只是發現播完，不算一個 tick
+    if source.finished and costs:
+        costs.pop()
+    return np.array(costs), player
+
+
+def print_report(costs, player):
+    if costs.size == 0:
+        print('沒有任何畫面')
+        return
+    total = costs.sum() / 1000
+    print(f'tick 數: {costs.size}，總耗時 {total:.2f}s，{costs.size / total:.1f} tick/s')
+    print(f'每 tick: 平均 {costs.mean():.2f}ms，p50 {np.percentile(costs, 50):.2f}ms，'
+          f'p95 {np.percentile(costs, 95):.2f}ms，最大 {costs.max():.2f}ms')
+    if player.keys:
+        print('按鍵次數: ' + '，'.join(f'{k}×{n}' for k, n in player.keys.most_common()))
+    print(f'最後狀態: {player.lastStatus}')
+
+
+def record_session(wName, outDir, fps, count):
+    """從遊戲視窗錄製 session（僅限 Windows）"""
+    from santa.Lib32 import FindWindow_bySearch
+    hwnd = FindWindow_bySearch(wName)
+    if hwnd is None:
+        print(f'找不到視窗: {wName}')
+        return
+    source = Win32FrameSource(hwnd)
+    recorder = SessionRecorder(outDir)
+    try:
+        for n in range(count):
+            img = source.read()
+            if img is not None:
+                recorder.write(img)
+            print(f'\r已錄製 {n + 1}/{count}', end='')
+            sleep(1 / fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+    print(f'\n已儲存至 {outDir}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m santa.replay')
+    parser.add_argument('path', nargs='?', help='PNG 資料夾、session 資料夾或影片檔')
+    parser.add_argument('--profile', default='', help='profile/ 底下的設定檔名稱')
+    parser.add_argument('--fps', type=float, default=0,
+                        help='重播速度；0 = 不限速（預設），-1 = 依錄製時的節奏')
+    parser.add_argument('--loop', type=int, default=1, help='重播輪數')
+    parser.add_argument('--record', nargs=2, metavar=('WINDOW', 'OUT_DIR'), help='錄製 session')
+    parser.add_argument('--count', type=int, default=300, help='錄製張數')
+    args = parser.parse_args()
+
+    if args.record:
+        record_session(args.record[0], args.record[1], args.fps or 2, args.count)
+    elif args.path:
+        fps = None if args.fps < 0 else args.fps
+        source = open_replay_source(args.path, fps=fps, loop=args.loop > 1)
+        maxTicks = source.frame_count * args.loop if args.loop > 1 else None
+        print_report(*run_benchmark(source, args.profile, maxTicks))
+    else:
+        parser.print_help()
@@ -34,6 +34,7 @@ class ROI:
         x = 71.23
         y1 = 20.88
         y2 = 61.43
+        w = 20.0  # 面板寬度：像素偵測只掃 x 這一條直線，模板擷取提示框與搜尋範圍用這個寬度涵蓋整個面板
         match_threshold_pct = 72.0  # 匹配像素佔比 >= 此值判定為開啟
     
     # ====== 血條偵測 (detectHPPercent) ======
@@ -69,6 +70,7 @@ class ROI:
         x1 = 83.8
         x2 = 87.0
         y = 69.07
+        h = 5.0  # 攻擊圖示高度：像素偵測只掃 y 這一條橫線，模板擷取提示框與搜尋範圍用這個高度涵蓋整個圖示
         r_minus_g_threshold = 64
         r_minus_b_threshold = 90
         rate_threshold = 17  # attRate >= 此值判定攻擊中
@@ -91,3 +93,43 @@ class ROI:
         area2_r_minus_g = 48
         area2_r_minus_b = 90
         area2_rate_threshold = 2
+    
+    # ====== 黑畫面/讀取畫面 (isDarkByPixel) ======
+    class Dark:
+        sample_step = 16  # 每隔幾個像素取樣（長寬各取 1/16，約兩千個點）
+        pixel_max = 30  # R、G、B 都低於此值的取樣點算暗點
+        dark_ratio_pct = 95.0  # 暗點佔比 >= 此值判定為黑畫面（容許讀取條、小字）
+        
+        # 連續黑畫面時的截圖間隔：前 backoff_after 張用 poll_sec，之後每張加倍，最多 backoff_max_sec
+        poll_sec = 0.3
+        backoff_after = 3
+        backoff_max_sec = 2.0
+    
+    # ====== 模板搜尋範圍 (TemplateDetector) ======
+    class TemplateSearch:
+        padding_pct = 3.0  # 預期位置四周外擴的畫面百分比
+        
+        # 金字塔比對：{模板名稱: 縮小倍率}，全畫面搜尋時先在縮小圖上粗找再回原圖精修
+        # 例如 {'panel_opened': 2}；未列出的模板維持原解析度比對
+        pyramid = {}
+        pyramid_refine_px = 2  # 精修時在粗略位置四周額外搜尋的像素
+        pyramid_min_template = 8  # 縮小後模板邊長低於此值就不用金字塔
+
+
+# 各模板在畫面上的預期位置 (x, y, w, h)，由上方 ROI 推導。
+# 模板擷取時若有記錄實際位置（templates/_regions.json），以記錄為準。
+TEMPLATE_REGIONS = {
+    'team_enabled': (
+        ROI.Team.cp1_x,
+        min(ROI.Team.cp1_y1, ROI.Team.cp2_y1),
+        ROI.Team.cp2_x - ROI.Team.cp1_x,
+        max(ROI.Team.cp1_y2, ROI.Team.cp2_y2) - min(ROI.Team.cp1_y1, ROI.Team.cp2_y1),
+    ),
+    'panel_opened': (ROI.Panel.x, ROI.Panel.y1, ROI.Panel.w, ROI.Panel.y2 - ROI.Panel.y1),
+    'is_attack': (ROI.Attack.x1, ROI.Attack.y, ROI.Attack.x2 - ROI.Attack.x1, ROI.Attack.h),
+    # 像素偵測的區域 1；內附的 is_attacked.png 實際在右下角更低處 (94.5%, 86.4%)，已記錄在 _regions.json
+    'is_attacked': (
+        ROI.Attacked.area1_x1, ROI.Attacked.area1_y0,
+        ROI.Attacked.area1_x2 - ROI.Attacked.area1_x1, ROI.Attacked.area1_y_range,
+    ),
+}
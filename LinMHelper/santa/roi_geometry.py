@@ -0,0 +1,139 @@
+"""
+ROI 幾何編譯 — 把 roi_config.ROI 的百分比座標一次換算成整數 slice / index array。
+同一個解析度只編譯一次並快取，視窗大小改變時才重新編譯。
+
+使用方式:
+    geo = compile_roi(width, height)
+    col = arr[geo.team_cp1]            # 直接用 slice 取像素
+    slot = geo.team_slot(teamPosition)
+    row = arr[slot.hp_row]
+"""
+from collections import namedtuple
+from threading import Lock
+
+import numpy as np
+
+from santa.roi_config import ROI
+
+# 依隊伍位置而定的取樣點：確認點 (y, x)、HP 列、MP 列
+TeamSlot = namedtuple('TeamSlot', ['point', 'hp_row', 'mp_row'])
+
+
+class CompiledROI:
+    """某個解析度下、已換算成像素的完整 ROI 集合（唯讀，可跨 thread 共用）"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        px, py = self.px, self.py
+
+        # 組隊狀態：兩條直線
+        team = ROI.Team
+        self.team_cp1 = (slice(py(team.cp1_y1), py(team.cp1_y2)), px(team.cp1_x))
+        self.team_cp2 = (slice(py(team.cp2_y1), py(team.cp2_y2)), px(team.cp2_x))
+
+        # 道具/技能面板：一條直線
+        panel = ROI.Panel
+        self.panel = (slice(py(panel.y1), py(panel.y2)), px(panel.x))
+
+        # HP / MP：橫線的 x 範圍（y 依隊伍位置而定，見 team_slot）
+        self.hp_cols = slice(px(ROI.HP.x1), px(ROI.HP.x2))
+        self.mp_cols = slice(px(ROI.MP.x1), px(ROI.MP.x2))
+
+        # 攻擊狀態：斜線，x 每前進 1，y 也往下 1
+        attack = ROI.Attack
+        xs = np.arange(px(attack.x1), px(attack.x2))
+        self.attack = (py(attack.y) + np.arange(xs.size), xs)
+        self.attack_span = px(attack.x2) - px(attack.x1) + 1
+
+        # 被攻擊：右下角區塊 + 左上角橫線
+        attacked = ROI.Attacked
+        self.attacked_area1 = (
+            slice(py(attacked.area1_y0), py(attacked.area1_y0 + attacked.area1_y_range)),
+            slice(px(attacked.area1_x1), px(attacked.area1_x2)),
+        )
+        self.attacked_area2 = (py(attacked.area2_y), slice(px(attacked.area2_x1), px(attacked.area2_x2)))
+        self.attacked_area2_span = px(attacked.area2_x2) - px(attacked.area2_x1) + 1
+
+        self._team_slots = {}
+        self._probe_index = {}
+
+    def px(self, xPercent):
+        return int(xPercent * self.width / 100)
+
+    def py(self, yPercent):
+        return int(yPercent * self.height / 100)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @staticmethod
+    def team_shift(teamPosition):
+        """隊伍位置 1~N → 0~N-1（0 與 None 視為第一格）"""
+        shiftUnit = int(teamPosition) if teamPosition is not None else 0
+        return shiftUnit - 1 if shiftUnit >= 1 else shiftUnit
+
+    def team_slot(self, teamPosition):
+        """取得指定隊伍位置的取樣點（依 shift 快取）"""
+        shift = self.team_shift(teamPosition)
+        slot = self._team_slots.get(shift)
+        if slot is None:
+            pos = ROI.TeamPosition
+            slot = TeamSlot(
+                point=(self.py(pos.base_y + pos.y_step * shift), self.px(pos.x)),
+                hp_row=(self.py(ROI.HP.base_y_offset + shift * ROI.HP.y_step), self.hp_cols),
+                mp_row=(self.py(ROI.MP.base_y_offset + shift * ROI.MP.y_step), self.mp_cols),
+            )
+            self._team_slots[shift] = slot
+        return slot
+
+    def probe_index(self, teamPosition=0):
+        """所有取樣點的 (ys, xs) index array（含設定位置與第一格），供 debug overlay 一次塗色"""
+        shift = self.team_shift(teamPosition)
+        index = self._probe_index.get(shift)
+        if index is None:
+            regions = [self.team_cp1, self.team_cp2, self.panel,
+                       self.attacked_area1, self.attacked_area2]
+            for position in {teamPosition, 0}:
+                slot = self.team_slot(position)
+                regions += [slot.point, slot.hp_row, slot.mp_row]
+            parts = [_region_index(rows, cols) for rows, cols in regions]
+            parts.append(self.attack)
+            ys = np.concatenate([p[0] for p in parts])
+            xs = np.concatenate([p[1] for p in parts])
+            inside = (ys >= 0) & (ys < self.height) & (xs >= 0) & (xs < self.width)
+            index = (ys[inside], xs[inside])
+            self._probe_index[shift] = index
+        return index
+
+
+def _region_index(rows, cols):
+    """(rows, cols)（int 或 slice）→ 展開成平坦的 (ys, xs)"""
+    ys = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else np.array([rows])
+    xs = np.arange(cols.start, cols.stop) if isinstance(cols, slice) else np.array([cols])
+    ys, xs = np.broadcast_arrays(ys[:, None], xs[None, :])
+    return ys.ravel(), xs.ravel()
+
+
+_cache = {}
+_cache_lock = Lock()
+
+
+def compile_roi(width, height):
+    """取得 (width, height) 的 CompiledROI，同解析度只編譯一次"""
+    key = (width, height)
+    geo = _cache.get(key)
+    if geo is None:
+        with _cache_lock:
+            geo = _cache.get(key)
+            if geo is None:
+                geo = CompiledROI(width, height)
+                _cache[key] = geo
+    return geo
+
+
+def clear_roi_cache():
+    """清除快取（修改 ROI 設定後呼叫）"""
+    with _cache_lock:
+        _cache.clear()
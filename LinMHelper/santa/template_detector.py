@@ -7,13 +7,19 @@
     2. 之後偵測時自動載入模板做比對
 
 模板圖片存放在 santa/templates/ 目錄下。
+比對時會先在模板預期位置附近的小範圍搜尋（roi_config.TEMPLATE_REGIONS 或擷取時記錄的位置），
+找不到才退回全畫面搜尋；全畫面搜尋可逐模板開啟金字塔模式（先縮小粗找、再回原圖精修）。
 """
+import json
 import os
 import cv2
 import numpy as np
 from PIL import Image
+from santa.frame import Frame, downscale
+from santa.roi_config import ROI, TEMPLATE_REGIONS
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+REGIONS_FILE = '_regions.json'
 
 
 class TemplateDetector:
@@ -22,17 +28,95 @@ class TemplateDetector:
     def __init__(self, template_dir=TEMPLATE_DIR):
         self.template_dir = template_dir
         self._cache = {}  # 模板快取 {name: numpy_array}
+        self._prepared = {}  # 已轉灰階並縮放好的模板 {(name, frame_w, frame_h, method, scale): gray_array}
+        self._pyramid = dict(ROI.TemplateSearch.pyramid)  # 金字塔比對倍率 {name: scale}
         self.orig_screen_size = None  # 記錄截取模板時的視窗解析度 (w, h)
+        self._regions = {}  # 擷取時記錄的模板位置 {name: (x, y, w, h) 百分比}
+        self.generation = 0  # 模板、搜尋範圍或倍率有變動就 +1，外部的比對結果快取據此失效
         os.makedirs(template_dir, exist_ok=True)
         self._load_orig_screen_size()
+        self._load_regions()
     
     def _load_orig_screen_size(self):
         full_path = os.path.join(self.template_dir, '_full_screenshot.png')
         if os.path.exists(full_path):
             full = cv2.imread(full_path)
             if full is not None:
-                self.orig_screen_size = (full.shape[1], full.shape[0])
+                size = (full.shape[1], full.shape[0])
+                if size != self.orig_screen_size:
+                    # 基準解析度改變，所有縮放過的模板都要重做
+                    self._prepared.clear()
+                    self.generation += 1
+                self.orig_screen_size = size
                 
+    def _load_regions(self):
+        path = os.path.join(self.template_dir, REGIONS_FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._regions = {name: tuple(region) for name, region in json.load(f).items()}
+        except (OSError, ValueError, TypeError) as e:
+            print(f'模板位置記錄讀取失敗: {e}')
+            self._regions = {}
+    
+    def _save_regions(self):
+        path = os.path.join(self.template_dir, REGIONS_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({name: list(region) for name, region in self._regions.items()}, f, indent=2)
+    
+    def save_search_region(self, name, x_pct, y_pct, w_pct, h_pct):
+        """記錄模板在畫面上的實際位置（百分比），之後比對時優先在附近搜尋"""
+        self._regions[name] = (x_pct, y_pct, w_pct, h_pct)
+        self._save_regions()
+        self.generation += 1
+    
+    def remove_search_region(self, name):
+        """刪除模板位置記錄（改用 ROI 推導的預設位置）"""
+        if self._regions.pop(name, None) is not None:
+            self._save_regions()
+            self.generation += 1
+    
+    def get_search_region(self, name):
+        """取得模板的預期位置 (x, y, w, h) 百分比；沒有則回傳 None"""
+        return self._regions.get(name) or TEMPLATE_REGIONS.get(name)
+    
+    def _search_window(self, name, curr_w, curr_h, tmpl_w, tmpl_h):
+        """
+        預期位置外擴 padding 後的搜尋範圍 (x0, y0, x1, y1)，像素座標。
+        沒有預期位置、或範圍已涵蓋整張圖時回傳 None（直接全畫面搜尋）。
+        """
+        region = self.get_search_region(name)
+        if region is None:
+            return None
+        
+        x, y, w, h = region
+        pad = ROI.TemplateSearch.padding_pct
+        x0 = max(0, int((x - pad) * curr_w / 100))
+        y0 = max(0, int((y - pad) * curr_h / 100))
+        x1 = min(curr_w, int((x + w + pad) * curr_w / 100) + 1)
+        y1 = min(curr_h, int((y + h + pad) * curr_h / 100) + 1)
+        
+        # 範圍至少要放得下模板
+        if x1 - x0 < tmpl_w:
+            x0 = max(0, min(x0, curr_w - tmpl_w))
+            x1 = min(curr_w, x0 + tmpl_w)
+        if y1 - y0 < tmpl_h:
+            y0 = max(0, min(y0, curr_h - tmpl_h))
+            y1 = min(curr_h, y0 + tmpl_h)
+        
+        if x0 == 0 and y0 == 0 and x1 == curr_w and y1 == curr_h:
+            return None
+        return x0, y0, x1, y1
+    
+    def search_window(self, name, curr_w, curr_h, method=cv2.TM_CCOEFF_NORMED):
+        """match_template 會先搜尋的局部範圍 (x0, y0, x1, y1)；沒有模板或直接全畫面時回傳 None"""
+        gray_tmpl = self.get_prepared_template(name, curr_w, curr_h, method)
+        if gray_tmpl is None:
+            return None
+        h, w = gray_tmpl.shape[:2]
+        return self._search_window(name, curr_w, curr_h, w, h)
+    
     def _get_scaled_gray_template(self, template, curr_w, curr_h):
         gray_tmpl = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
         if self.orig_screen_size is not None:
@@ -69,9 +153,52 @@ class TemplateDetector:
             self._cache[name] = template
         return template
     
+    def get_prepared_template(self, name, curr_w, curr_h, method=cv2.TM_CCOEFF_NORMED, scale=1):
+        """
+        取得可直接比對的灰階模板（已依目前畫面解析度縮放）。
+        以 (name, frame_w, frame_h, method, scale) 快取，穩定狀態下不做任何模板前處理。
+        scale > 1 時回傳金字塔用、再縮小 scale 倍的版本。
+        """
+        key = (name, curr_w, curr_h, method, scale)
+        gray_tmpl = self._prepared.get(key)
+        if gray_tmpl is None:
+            if scale == 1:
+                template = self.load_template(name)
+                if template is None:
+                    return None
+                gray_tmpl = self._get_scaled_gray_template(template, curr_w, curr_h)
+            else:
+                full_tmpl = self.get_prepared_template(name, curr_w, curr_h, method)
+                if full_tmpl is None:
+                    return None
+                gray_tmpl = downscale(full_tmpl, scale)
+            self._prepared[key] = gray_tmpl
+        return gray_tmpl
+    
+    def set_pyramid(self, name, scale):
+        """設定模板的金字塔比對倍率；scale <= 1 代表關閉"""
+        if scale and scale > 1:
+            self._pyramid[name] = int(scale)
+        else:
+            self._pyramid.pop(name, None)
+        self.generation += 1
+    
+    def get_pyramid(self, name):
+        return self._pyramid.get(name, 1)
+    
+    def invalidate_template(self, name):
+        """模板檔案被改寫或刪除後呼叫：丟掉原圖與所有縮放版本的快取"""
+        self._cache.pop(name, None)
+        for key in [k for k in self._prepared if k[0] == name]:
+            self._prepared.pop(key, None)
+        self.generation += 1
+        self._load_orig_screen_size()
+    
     def clear_cache(self):
-        """清除模板快取"""
+        """清除模板快取（含縮放後的灰階模板）"""
         self._cache.clear()
+        self._prepared.clear()
+        self.generation += 1
     
     def pil_to_cv2(self, pil_img):
         """PIL Image → cv2 numpy array (BGR)"""
@@ -82,6 +209,16 @@ class TemplateDetector:
             rgb = rgb[:, :, :3]  # RGBA → RGB
         return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
     
+    def to_gray(self, img):
+        """Frame / PIL Image / BGR array → 灰階 array；Frame 用它記住的灰階，已是灰階（2 維）則直接沿用"""
+        if isinstance(img, Frame):
+            return img.gray
+        if isinstance(img, Image.Image):
+            img = self.pil_to_cv2(img)
+        if img.ndim == 2:
+            return img
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    
     def cv2_to_pil(self, cv2_img):
         """cv2 numpy array (BGR) → PIL Image"""
         rgb = cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB)
@@ -89,15 +226,19 @@ class TemplateDetector:
     
     # ====== 核心比對方法 ======
     
-    def match_template(self, img, template_name, threshold=0.8, method=cv2.TM_CCOEFF_NORMED):
+    def match_template(self, img, template_name, threshold=0.8, method=cv2.TM_CCOEFF_NORMED,
+                       use_region=True):
         """
         在圖片中搜尋模板，回傳最佳匹配位置和信心度。
+        預設先在模板預期位置附近搜尋，沒有達到門檻才退回全畫面搜尋，
+        因此 matched 結果與直接全畫面搜尋一致。
         
         Args:
-            img: PIL Image 或 cv2 numpy array
+            img: Frame（建議，同一 tick 共用灰階）、PIL Image、cv2 numpy array (BGR) 或灰階 array
             template_name: 模板名稱（不含 .png）
             threshold: 匹配信心度門檻 (0~1)
             method: cv2 匹配方法
+            use_region: 是否先在預期位置附近搜尋
         
         Returns:
             (matched, confidence, location) 
@@ -105,76 +246,115 @@ class TemplateDetector:
             - confidence: float, 最佳匹配信心度
             - location: (x, y, w, h) 或 None
         """
-        template = self.load_template(template_name)
-        if template is None:
+        # 灰階及動態解析度縮放（確保不同大小的模擬器視窗也能比對成功）
+        gray_img = self.to_gray(img)
+        curr_h, curr_w = gray_img.shape[:2]
+        gray_tmpl = self.get_prepared_template(template_name, curr_w, curr_h, method)
+        if gray_tmpl is None:
             return False, 0.0, None
+        h, w = gray_tmpl.shape[:2]
         
-        if isinstance(img, Image.Image):
-            img = self.pil_to_cv2(img)
+        # 先在預期位置附近找
+        window = self._search_window(template_name, curr_w, curr_h, w, h) if use_region else None
+        if window is not None:
+            x0, y0, x1, y1 = window
+            confidence, loc = self._best_match(gray_img[y0:y1, x0:x1], gray_tmpl, method)
+            if confidence >= threshold:
+                return True, confidence, (loc[0] + x0, loc[1] + y0, w, h)
+        
+        # 退回全畫面搜尋（有設定金字塔倍率時先粗後精）
+        confidence, loc = self._full_frame_match(img, gray_img, template_name, gray_tmpl, method)
+        matched = confidence >= threshold
+        location = (loc[0], loc[1], w, h) if matched else None
+        
+        return matched, confidence, location
+    
+    def _full_frame_match(self, img, gray_img, template_name, gray_tmpl, method):
+        """全畫面搜尋；模板有設定金字塔倍率且縮小後仍夠大時走金字塔模式"""
+        scale = self.get_pyramid(template_name)
+        if scale > 1:
+            curr_h, curr_w = gray_img.shape[:2]
+            small_tmpl = self.get_prepared_template(template_name, curr_w, curr_h, method, scale)
+            if min(small_tmpl.shape[:2]) >= ROI.TemplateSearch.pyramid_min_template:
+                small_img = img.gray_scaled(scale) if isinstance(img, Frame) else downscale(gray_img, scale)
+                return self._pyramid_match(gray_img, small_img, gray_tmpl, small_tmpl, method, scale)
+        return self._best_match(gray_img, gray_tmpl, method)
+    
+    def _pyramid_match(self, gray_img, small_img, gray_tmpl, small_tmpl, method, scale):
+        """先在縮小圖上找粗略位置，再回原解析度只比對附近一小塊"""
+        _, (cx, cy) = self._best_match(small_img, small_tmpl, method)
         
-        # 灰階及動態解析度縮放（確保不同大小的模擬器視窗也能比對成功）
-        gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         curr_h, curr_w = gray_img.shape[:2]
-        gray_tmpl = self._get_scaled_gray_template(template, curr_w, curr_h)
+        h, w = gray_tmpl.shape[:2]
+        r = scale + ROI.TemplateSearch.pyramid_refine_px
+        x0 = max(0, cx * scale - r)
+        y0 = max(0, cy * scale - r)
+        x1 = min(curr_w, cx * scale + r + w)
+        y1 = min(curr_h, cy * scale + r + h)
         
+        confidence, (x, y) = self._best_match(gray_img[y0:y1, x0:x1], gray_tmpl, method)
+        return confidence, (x + x0, y + y0)
+    
+    def _best_match(self, gray_img, gray_tmpl, method):
+        """回傳 (confidence, (x, y))，已依 method 處理 min/max"""
         result = cv2.matchTemplate(gray_img, gray_tmpl, method)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
         
         # TM_CCOEFF_NORMED 和 TM_CCORR_NORMED 用 max
         if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
-            confidence = 1 - min_val
-            loc = min_loc
-        else:
-            confidence = max_val
-            loc = max_loc
-        
-        h, w = gray_tmpl.shape[:2]
-        matched = confidence >= threshold
-        location = (loc[0], loc[1], w, h) if matched else None
-        
-        return matched, confidence, location
+            return 1 - min_val, min_loc
+        return max_val, max_loc
     
     def match_template_multi(self, img, template_name, threshold=0.8, method=cv2.TM_CCOEFF_NORMED):
         """
-        在圖片中搜尋所有匹配的模板位置。
+        在圖片中搜尋所有匹配的模板位置。img 格式同 match_template。
         
         Returns:
             list of (confidence, x, y, w, h)
         """
-        template = self.load_template(template_name)
-        if template is None:
-            return []
-        
-        if isinstance(img, Image.Image):
-            img = self.pil_to_cv2(img)
-        
         # 灰階及動態解析度縮放
-        gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray_img = self.to_gray(img)
         curr_h, curr_w = gray_img.shape[:2]
-        gray_tmpl = self._get_scaled_gray_template(template, curr_w, curr_h)
+        gray_tmpl = self.get_prepared_template(template_name, curr_w, curr_h, method)
+        if gray_tmpl is None:
+            return []
         
         result = cv2.matchTemplate(gray_img, gray_tmpl, method)
         h, w = gray_tmpl.shape[:2]
         
-        locations = np.where(result >= threshold)
-        matches = []
-        for pt in zip(*locations[::-1]):  # x, y
-            conf = result[pt[1], pt[0]]
-            matches.append((float(conf), pt[0], pt[1], w, h))
-        
-        # NMS: 去重疊（距離太近的只留信心度最高的）
-        matches.sort(key=lambda m: m[0], reverse=True)
-        filtered = []
-        for m in matches:
-            too_close = False
-            for f in filtered:
-                if abs(m[1] - f[1]) < w // 2 and abs(m[2] - f[2]) < h // 2:
-                    too_close = True
-                    break
-            if not too_close:
-                filtered.append(m)
-        
-        return filtered
+        return self._non_max_suppression(result, threshold, w, h)
+    
+    def _non_max_suppression(self, result, threshold, w, h, chunk=64):
+        """
+        NMS: 距離太近（|dx| < w//2 且 |dy| < h//2）的只留信心度最高的。
+        依信心度由高到低處理，每保留一點就在 blocked 遮罩上把它周圍的方框一次標起來，
+        候選點則成批查表跳過已被抑制的，不必兩兩比對。結果與逐點貪婪抑制相同。
+        """
+        half_w, half_h = w // 2, h // 2
+        ys, xs = np.nonzero(result >= threshold)
+        confs = result[ys, xs]
+        order = np.argsort(-confs, kind='stable')
+        ys, xs, confs = ys[order], xs[order], confs[order]
+        
+        if half_w < 1 or half_h < 1:
+            # 方框為空，不會抑制任何點
+            keep = range(len(confs))
+        else:
+            blocked = np.zeros(result.shape, dtype=bool)
+            keep = []
+            i, n = 0, len(confs)
+            while i < n:
+                free = np.flatnonzero(~blocked[ys[i:i + chunk], xs[i:i + chunk]])
+                if free.size == 0:
+                    i += chunk
+                    continue
+                i += int(free[0])
+                y, x = ys[i], xs[i]
+                blocked[max(0, y - half_h + 1):y + half_h, max(0, x - half_w + 1):x + half_w] = True
+                keep.append(i)
+                i += 1
+        
+        return [(float(confs[i]), int(xs[i]), int(ys[i]), w, h) for i in keep]
     
     # ====== 模板擷取工具 ======
     
@@ -201,12 +381,11 @@ class TemplateDetector:
         path = self._get_template_path(name)
         cropped.save(path, 'PNG')
         
-        # 更新截圖基準解析度
-        self._load_orig_screen_size()
+        # 記錄模板位置，之後比對時優先在附近搜尋
+        self.save_search_region(name, x_pct, y_pct, w_pct, h_pct)
         
-        # 清除此模板的快取
-        if name in self._cache:
-            del self._cache[name]
+        # 清除此模板的快取（含縮放版本），並更新截圖基準解析度
+        self.invalidate_template(name)
         
         print(f'模板已儲存: {path} ({w}x{h})')
         return path
@@ -0,0 +1,102 @@
+"""
+Tick 節奏控制 — 依目前狀態決定目標 fps，扣掉 tick 本身的執行時間後才等待，
+取代 _decide_action 裡寫死的 sleep 秒數。
+
+    danger  : 血量下降、被攻擊、需要補血 → 盡快重新截圖
+    combat  : 戰鬥中施放攻擊魔法
+    active  : 剛送出按鍵，等畫面反應
+    idle    : 沒事做
+    blocked : 面板打開、偵測不到組隊
+    dark    : 黑畫面，實際間隔由 hold（_dark_backoff）決定
+
+使用方式:
+    scheduler = TickScheduler()
+    scheduler.begin()                         # tick 開始
+    ...
+    scheduler.plan('combat', state=state)     # 決定下一次 tick 的時間
+    sleep(scheduler.remaining())              # 已扣掉 tick 耗時
+    scheduler.achieved_fps                    # 實際達到的每秒 tick 數
+"""
+from collections import deque
+from time import monotonic
+
+from santa.roi_config import ROI
+
+# 各狀態的目標 fps（每秒 tick 數）
+TICK_RATES = {
+    'danger': 5.0,
+    'combat': 2.5,
+    'active': 2.0,
+    'idle': 1.0,
+    'blocked': 0.5,
+    'dark': 1.0 / ROI.Dark.poll_sec,
+}
+
+
+class TickScheduler:
+    """單一玩家的 tick 排程（monotonic clock）"""
+
+    def __init__(self, rates=None, window=20):
+        """
+        Args:
+            rates: 覆寫 TICK_RATES 的部分狀態
+            window: 計算實際 fps 時取最近幾次 tick 的間隔
+        """
+        self.rates = dict(TICK_RATES, **(rates or {}))
+        self.tier = 'idle'
+        self._tickStart = None
+        self._due = None
+        self._lastHp = -1
+        self._intervals = deque(maxlen=window)
+
+    def begin(self) -> None:
+        """tick 開始時呼叫，記錄起點並累計實際間隔"""
+        now = monotonic()
+        if self._tickStart is not None:
+            self._intervals.append(now - self._tickStart)
+        self._tickStart = now
+
+    def elapsed(self) -> float:
+        """目前 tick 已經執行的秒數"""
+        return monotonic() - self._tickStart if self._tickStart is not None else 0.0
+
+    def plan(self, tier: str, hold: float = 0.0, state=None) -> str:
+        """
+        決定下一次 tick 的時間。
+
+        Args:
+            tier: _decide_action 判斷的狀態（TICK_RATES 的 key）
+            hold: 至少要等的秒數（例如瞬移後等畫面過渡），與 fps 週期取較長者
+            state: FrameState；HP 比上一張低或正在被攻擊時升級為 danger
+        Returns:
+            實際採用的狀態
+        """
+        if state is not None and not state.isDark:
+            hpFalling = 0 < state.hp < self._lastHp
+            if state.hp >= 0:
+                self._lastHp = state.hp
+            if hpFalling or state.isAttacked:
+                tier = 'danger'
+        self.tier = tier
+        period = max(1.0 / self.rates[tier], hold)
+        start = self._tickStart if self._tickStart is not None else monotonic()
+        self._due = start + period
+        return tier
+
+    @property
+    def due(self) -> float:
+        """下一次 tick 的 monotonic 時間（尚未排程時為現在）"""
+        return self._due if self._due is not None else monotonic()
+
+    def remaining(self) -> float:
+        """距離下一次 tick 還要等幾秒（已扣掉本次 tick 的執行時間）"""
+        if self._due is None:
+            return 0.0
+        return max(0.0, self._due - monotonic())
+
+    @property
+    def achieved_fps(self) -> float:
+        """最近幾次 tick 實際達到的每秒次數"""
+        if not self._intervals:
+            return 0.0
+        return len(self._intervals) / sum(self._intervals)
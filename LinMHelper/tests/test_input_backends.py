@@ -0,0 +1,100 @@
+"""
+輸入後端的離線測試（santa.fakes 的假 monkey server，不需要模擬器）。
+
+使用方式:
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+from santa.fakes import FakeMonkeyServer, fake_adb_argv
+from santa.input_backends import AdbShellInput, InputBackend, MonkeyInput
+
+
+class RecordingInput(InputBackend):
+    """記錄點擊的 fallback"""
+
+    def __init__(self):
+        self.taps = []
+
+    def tap(self, x, y):
+        self.taps.append((x, y))
+
+
+class AdbShellInputTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.logPath = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.logPath)
+
+    def received_taps(self):
+        with open(self.logPath, encoding='utf-8') as f:
+            return [line.strip() for line in f if line.startswith('input tap')]
+
+    def test_tap(self):
+        fallback = RecordingInput()
+        backend = AdbShellInput('test', argv=fake_adb_argv(self.logPath), fallback=fallback)
+        for k in range(5):
+            backend.tap(k, k)
+        backend.close()
+        self.assertEqual(self.received_taps(), ['input tap %d %d' % (k, k) for k in range(5)])
+        self.assertEqual(fallback.taps, [])
+
+    def test_dead_shell_does_not_lose_taps(self):
+        # 假 shell 收到 4 行（含啟動時的 ping）後結束，之後的點擊寫入 pipe 仍可能成功
+        fallback = RecordingInput()
+        backend = AdbShellInput('test', argv=fake_adb_argv(self.logPath, dieAfter=4), fallback=fallback)
+        backend.RESPAWN_BACKOFF = 60
+        for k in range(8):
+            backend.tap(k, k)
+        backend.close()
+        sent = set(self.received_taps()) | {'input tap %d %d' % tap for tap in fallback.taps}
+        self.assertEqual(sent, {'input tap %d %d' % (k, k) for k in range(8)})
+
+
+class MonkeyInputTest(unittest.TestCase):
+
+    def test_tap(self):
+        with FakeMonkeyServer() as server:
+            fallback = RecordingInput()
+            backend = MonkeyInput('test', address=server.address, fallback=fallback)
+            backend.tap(100, 200)
+            backend.tap(300, 400)
+            backend.close()
+        self.assertEqual(server.commands, ['wake', 'tap 100 200', 'tap 300 400'])
+        self.assertEqual(fallback.taps, [])
+
+    def test_reconnect_after_drop(self):
+        with FakeMonkeyServer() as server:
+            fallback = RecordingInput()
+            backend = MonkeyInput('test', address=server.address, fallback=fallback)
+            backend.tap(1, 2)
+            server.drop_clients()
+            backend.tap(3, 4)
+            backend.close()
+        self.assertEqual(server.commands.count('tap 3 4'), 1)
+        self.assertEqual(server.accepts, 2)
+        self.assertEqual(fallback.taps, [])
+
+    def test_accept_then_close_backs_off(self):
+        # adb forward 在 monkey 沒有 listen 時會接受連線後立刻關閉
+        with FakeMonkeyServer(hangup=True) as server:
+            fallback = RecordingInput()
+            backend = MonkeyInput('test', address=server.address, fallback=fallback)
+            backend.CONNECT_TIMEOUT = 0.3
+            backend.tap(0, 0)
+            attempts = server.accepts
+            for k in range(1, 5):
+                backend.tap(k, k)
+            backend.close()
+        self.assertIsNotNone(backend._lastFailure)
+        self.assertEqual(server.accepts, attempts)  # RECONNECT_BACKOFF 內不再連線
+        self.assertEqual(fallback.taps, [(k, k) for k in range(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()